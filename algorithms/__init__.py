@@ -0,0 +1,66 @@
+import numpy as np
+from utils import csr_to_sets
+
+SOLVER_NAMES = ["BnB", "BnC", "MCS"]
+
+
+def get_solver_class(solver_name: str):
+    """Solver class by its name (LP based solvers need cplex, MCS does not)"""
+    if solver_name == "BnB":
+        from algorithms.branch_and_bound import BNBSolver
+
+        return BNBSolver
+    if solver_name == "BnC":
+        from algorithms.branch_and_cut import BNCSolver
+
+        return BNCSolver
+    from algorithms.combinatorial import MCSSolver
+
+    return MCSSolver
+
+
+def build_solver(
+    graph,
+    solver_name: str,
+    coloring_processes: int = 1,
+    seed: int = None,
+    use_cache: bool = True,
+    **solver_options,
+):
+    """Solver of the graph, for LP based solvers independent sets are generated (or loaded from the cache) first"""
+    solver_class = get_solver_class(solver_name)
+    if solver_name != "MCS":
+        graph.prepare_constraints(
+            # BnC model has no complement edges constraints
+            filter_not_connected=solver_name == "BnB",
+            use_cache=use_cache,
+            processes=coloring_processes,
+            seed=seed,
+        )
+    return solver_class(graph=graph, **solver_options)
+
+
+def restore_solver(
+    graph, solver_name: str, checkpoint_path: str, **solver_options
+):
+    """Solver which continues the search from the checkpoint (see MaxCliqueSolver.save_checkpoint)
+
+    The model is built from the checkpoint rows on the checkpoint subgraph of the graph,
+    so independent sets are not generated again.
+    """
+    with np.load(checkpoint_path) as file:
+        checkpoint = dict(file)
+    graph = graph.induced_subgraph(checkpoint["original_vertexes"])
+    # complement edges rows are restored as independent sets of size 2
+    graph.independent_vertex_sets = set(
+        csr_to_sets(checkpoint["base_rows_offsets"], checkpoint["base_rows"]),
+    )
+    graph.not_connected_vertexes = np.empty((0, 2), dtype=np.int32)
+    solver = get_solver_class(solver_name)(
+        graph=graph,
+        initial_clique=checkpoint["incumbent"].tolist(),
+        checkpoint_path=checkpoint_path,
+        **solver_options,
+    )
+    solver.restore_checkpoint(checkpoint)
+    return solver
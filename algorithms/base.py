@@ -1,5 +1,15 @@
 import math
-import cplex
+
+try:
+    import cplex
+except ImportError:
+    # LP based solvers are not available, combinatorial ones still work
+    cplex = None
+from algorithms.constraints import ConstraintRegistry
+from algorithms.heuristics import heuristic_clique, rounding_clique
+from algorithms.search import NodeQueue, SearchNode
+from algorithms.stats import SolverStats, timed
+from coloring import coloring_bound
 from graph import MCPGraph
 from utils import *
 import numpy as np
@@ -14,18 +24,119 @@ class MaxCliqueSolver:
         graph: MCPGraph,
         branching_strategy: str = "max",
         debug_mode: bool = False,
+        search_strategy: str = "recursive",
+        branching_mode: str = "constraint",
+        use_coloring_bound: bool = True,
+        heuristic_time_limit: float = 1.0,
+        primal_heuristic_frequency: int = 1,
+        primal_heuristic_max_depth: int = None,
+        initial_clique=None,
+        cutoff: int = 0,
+        threads: int = 0,
+        checkpoint_path: str = None,
+        checkpoint_interval: float = 60,
+        stats_sample_interval: float = None,
+        cplex_model=None,
     ):
         self.graph = graph
+        self.debug_mode = debug_mode
+        # per phase times and counters, (time, nodes, incumbent, bound) samples every stats_sample_interval seconds
+        self.stats = SolverStats(stats_sample_interval)
+        for phase, phase_time in graph.preparation_times.items():
+            self.stats.add_time(phase, phase_time)
         self.branching_strategy = branching_strategy
-        self.cplex_model = self.construct_model()
+        # "recursive" or node selection strategy of the iterative search (see algorithms.search)
+        self.search_strategy = search_strategy
+        # recursive search branches by "constraint" (x_i == value rows) or by variable "bound"
+        self.branching_mode = branching_mode
+        # prune nodes by greedy coloring bound before the LP solve
+        self.use_coloring_bound = use_coloring_bound
+        # time budget of the initial heuristic local search (0 - greedy only)
+        self.heuristic_time_limit = heuristic_time_limit
+        # (seconds, clique size) for every incumbent improvement of the local search
+        self.heuristic_history = []
+        # LP rounding heuristic runs every primal_heuristic_frequency LP solves
+        # (0 - never) at nodes not deeper than primal_heuristic_max_depth (None - any)
+        self.primal_heuristic_frequency = primal_heuristic_frequency
+        self.primal_heuristic_max_depth = primal_heuristic_max_depth
+        self.primal_heuristic_calls_num = 0
+        self.primal_heuristic_improvements_num = 0
+        # known clique vertexes (e.g. found before preprocessing), the initial heuristic is skipped
+        self.initial_clique = initial_clique
+        # clique size known elsewhere: only bigger cliques are searched
+        self.cutoff = cutoff
+        # vertexes fixed to 0 by the reduction with the incumbent size
+        self.removed_vertexes = 0
+        self.reduced_clique_size = 0
+        self.reduction_row_ids = []
+        # rows x_u + x_v <= 1 of deleted edges and independent subsets of broken rows (see apply_edge_changes)
+        self.edge_change_row_ids = []
+        # clique size bound known before the solve (e.g. of the previous solve if edges were only deleted)
+        self.known_upper_bound = None
+        # edge changes were applied after the last solve, their warm start waits for the next one
+        self.is_warm_start_pending = False
+        # search state is dumped to checkpoint_path every checkpoint_interval seconds
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.last_checkpoint_time = time.time()
+        # model construction rows are the same for all checkpoints
+        self.base_rows = None
+        # open nodes of the checkpoint the search continues from
+        self.resumed_nodes = None
+        if checkpoint_path is not None and search_strategy == "recursive":
+            # open nodes of the recursive search live in the call stack
+            self.search_strategy = "depth_first"
+        # problem of the previous solver to build the model in (its CPLEX environment is reused)
+        self.reused_cplex_model = cplex_model
+        with self.stats.timer("model_build"):
+            self.cplex_model = self.construct_model()
+        self.model_build_time = round(self.stats.times["model_build"], 3)
+        # CPLEX threads limit (0 - CPLEX default), e.g. when graphs are solved in parallel
+        if self.cplex_model is not None and threads > 0:
+            self.cplex_model.parameters.threads.set(threads)
+        self.constraint_registry = (
+            ConstraintRegistry(self.cplex_model)
+            if self.cplex_model is not None
+            else None
+        )
         self.best_solution = []
         self.maximum_clique_size = 0
-        self.branch_num = 0
         self.eps = 1e-5
-        self.debug_mode = debug_mode
         self.branch_num = 0
+        # number of solved nodes and time of the tree search
+        self.nodes_num = 0
+        self.search_time = 0
+        self.lp_solves_num = 0
+        # nodes pruned by coloring bound without LP solve
+        self.lp_solves_avoided_num = 0
+        # search limits (None - no limit) and the result status: "optimal", "time_limit" or "node_limit"
+        self.time_limit = None
+        self.node_limit = None
+        self.solve_start_time = None
+        self.status = None
+        # the biggest bound of nodes left unexplored by the limits
+        self.open_bound = 0
+        # global upper bound of the clique size and the optimality gap of the result
+        self.upper_bound = None
+        self.gap = None
+        # LP bounds of the current path nodes: depth -> LP objective value
+        self.lp_bounds = dict()
+        # recursive search: depth -> LP bound of the path node which second branch is not explored yet
+        self.open_subtree_bounds = dict()
+        # depth of the current search tree node
+        self.depth = 0
+        # variables fixed at the current node (by bounds or branching rows): index -> value
+        self.fixed_variables = dict()
+        # variables fixed by recursive branching, released on backtrack
+        self.branching_fixed_variables = []
 
     def construct_model(self):
+        if self.reused_cplex_model is not None:
+            # rows and columns are deleted, the environment and parameters are kept
+            problem = self.reused_cplex_model
+            problem.linear_constraints.delete()
+            problem.variables.delete()
+            return problem
         problem = cplex.Cplex()
         problem.set_results_stream(None)
         problem.set_warning_stream(None)
@@ -33,71 +144,734 @@ class MaxCliqueSolver:
         problem.objective.set_sense(problem.objective.sense.maximize)
         return problem
 
-    # below code taken from https://stackoverflow.com/questions/59009712/
-    # fastest-way-of-checking-if-a-subgraph-is-a-clique-in-networkx
+    def construct_set_model(self, rows_offsets, rows_vertexes):
+        """Model max sum(x_i), 0 <= x_i <= 1 with rows sum(x_i for i in row) <= 1
+
+        Rows are given as CSR arrays (see utils.sets_to_csr). The model is built column
+        wise: empty rows first, then columns with their row indices, so CPLEX gets one
+        sparse vector per vertex instead of one per row and no names to look up.
+        Columns x_i and rows c_j are named only in debug mode.
+        """
+        nodes_amount = self.graph.vertices_num
+        rows_amount = len(rows_offsets) - 1
+        problem = MaxCliqueSolver.construct_model(self)
+        problem.linear_constraints.add(
+            senses="L" * rows_amount,
+            rhs=[1.0] * rows_amount,
+            names=(
+                [f"c{x}" for x in range(rows_amount)]
+                if self.debug_mode
+                else None
+            ),
+        )
+        # CSR of rows -> CSC of columns: row indices grouped by vertex
+        row_ids = np.repeat(np.arange(rows_amount), np.diff(rows_offsets))
+        order = np.argsort(rows_vertexes, kind="stable")
+        columns_offsets = np.searchsorted(
+            rows_vertexes[order],
+            np.arange(nodes_amount + 1),
+        ).tolist()
+        columns_rows = row_ids[order].tolist()
+        ones = [1.0] * max(np.diff(columns_offsets), default=0)
+        problem.variables.add(
+            obj=[1.0] * nodes_amount,
+            ub=[1.0] * nodes_amount,
+            lb=[0.0] * nodes_amount,
+            types=["C"] * nodes_amount,
+            names=(
+                [f"x{x}" for x in range(nodes_amount)]
+                if self.debug_mode
+                else None
+            ),
+            columns=[
+                [columns_rows[start:end], ones[: end - start]]
+                for start, end in zip(
+                    columns_offsets[:-1], columns_offsets[1:]
+                )
+            ],
+        )
+        return problem
+
     def is_clique(self, nodelist):
-        chek_subgraph = self.graph.graph.subgraph(nodelist)
-        num_nodes = len(nodelist)
-        return (
-            chek_subgraph.size() == num_nodes * (num_nodes - 1) / 2,
-            chek_subgraph,
+        with self.stats.timer("clique_check"):
+            return self.graph.is_clique(nodelist)
+
+    def solve_lp(self):
+        """Solve LP of the model, its time and simplex iterations are added to stats"""
+        self.lp_solves_num += 1
+        with self.stats.timer("lp_solve"):
+            self.cplex_model.solve()
+        self.stats.count(
+            "lp_iterations",
+            self.cplex_model.solution.progress.get_num_iterations(),
+        )
+
+    def sample_progress(self):
+        """Sample the incumbent and the global bound if it is time to (see SolverStats)"""
+        if not self.stats.is_sample_due():
+            return
+        if self.search_strategy == "recursive":
+            # open nodes of the recursive search are the not explored second branches of the path
+            open_bound = max(self.open_subtree_bounds.values(), default=0)
+        else:
+            open_bound = self.node_queue.best_bound() or 0
+        # the current node is bounded by its parent
+        bound = max(
+            open_bound,
+            self.lp_bounds.get(self.depth - 1, self.graph.vertices_num),
+        )
+        self.stats.sample(
+            self.nodes_num,
+            self.maximum_clique_size,
+            max(bound, self.maximum_clique_size),
         )
 
-    @timeit
-    def solve(self):
+    def statistics(self) -> dict:
+        """Solver counters, per phase times and samples (e.g. for the per graph JSON)"""
+        self.stats.counters.update(
+            nodes=self.nodes_num,
+            branchings=self.branch_num,
+            lp_solves=self.lp_solves_num,
+            pruned_by_coloring=self.lp_solves_avoided_num,
+            primal_heuristic_calls=self.primal_heuristic_calls_num,
+            primal_heuristic_improvements=self.primal_heuristic_improvements_num,
+        )
+        return self.stats.to_dict()
+
+    @timed("solve")
+    def solve(self, time_limit: float = None, node_limit: int = None):
         raise NotImplementedError
 
-    def add_multiple_constraints(self, constraints):
-        constraint_senses = ["L"] * (len(constraints))
-        right_hand_side = [1.0] * (len(constraints))
-        constraint_names = [f"c{x}" for x in range(len(constraints))]
-        new_constraints = []
+    def set_limits(self, time_limit: float = None, node_limit: int = None):
+        """Start the solve with time (seconds) and node limits"""
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.solve_start_time = time.time()
+        self.status = None
+        self.open_bound = 0
+        self.is_warm_start_pending = False
 
-        for constraint in constraints:
-            constraint = [
-                [f"x{i}" for i in constraint],
-                [1.0] * len(constraint),
-            ]
-            new_constraints.append(constraint)
+    def is_limit_reached(self) -> bool:
+        """Check the time and node limits, the status is set by the first reached one"""
+        if self.status is None:
+            if (
+                self.time_limit is not None
+                and time.time() - self.solve_start_time >= self.time_limit
+            ):
+                self.status = "time_limit"
+            elif (
+                self.node_limit is not None
+                and self.nodes_num >= self.node_limit
+            ):
+                self.status = "node_limit"
+        return self.status is not None
 
-        self.cplex_model.linear_constraints.add(
-            lin_expr=new_constraints,
-            senses=constraint_senses,
-            rhs=right_hand_side,
-            names=constraint_names,
+    def skip_node(self, bound: float):
+        """The node is left unexplored by the limits, its bound stays open"""
+        self.open_bound = max(self.open_bound, bound)
+
+    def is_node_skipped(self) -> bool:
+        """Skip the current node if a limit is reached, its parent LP value bounds it"""
+        if not self.is_limit_reached():
+            return False
+        self.skip_node(
+            self.lp_bounds.get(self.depth - 1, self.graph.vertices_num),
+        )
+        self.stats.count("skipped_by_limits")
+        return True
+
+    def update_result_bounds(self):
+        """Global upper bound and optimality gap after the search"""
+        if self.status is None:
+            self.status = "optimal"
+            self.upper_bound = self.maximum_clique_size
+        else:
+            self.upper_bound = max(
+                self.maximum_clique_size,
+                math.floor(self.open_bound + self.eps),
+            )
+        self.gap = (self.upper_bound - self.maximum_clique_size) / max(
+            self.maximum_clique_size,
+            1,
+        )
+        logger.info(
+            f"|{self.graph.name}| Status: {self.status}, clique size {self.maximum_clique_size}, "
+            f"upper bound {self.upper_bound}, gap {self.gap:.2%}",
+        )
+
+    def add_multiple_constraints(self, constraints, depth: int = None):
+        """Add sum(x_i for i in constraint) <= 1 rows: global or local for the node at depth"""
+        return self.constraint_registry.add(constraints, depth)
+
+    def add_branching_constraint(self, branching_var_idx: int, value, depth):
+        # variable is fractional, so it is not fixed yet and gets [0, 1] back on backtrack
+        self.fixed_variables[branching_var_idx] = value
+        self.branching_fixed_variables.append(branching_var_idx)
+        if self.branching_mode == "bound":
+            self.cplex_model.variables.set_lower_bounds(
+                branching_var_idx,
+                value,
+            )
+            self.cplex_model.variables.set_upper_bounds(
+                branching_var_idx,
+                value,
+            )
+            return None
+        return self.constraint_registry.add_rows(
+            lin_expr=[[[branching_var_idx], [1.0]]],
+            senses=["E"],
+            rhs=[value],
+            depth=depth,
         )
 
-    def add_left_constraint(self, branching_var: tuple, current_branch: int):
+    def add_left_constraint(self, branching_var: tuple, depth: int):
         branching_var_idx, branching_var_value = branching_var
         # solver sometime can produce variables like that -1.1102230246251565e-16 and math.floor() round it to -1
         if math.floor(branching_var_value) == -1:
             branching_var_value = 0
-        right_hand_side = [math.floor(branching_var_value)]
         if self.debug_mode:
             logger.info(
                 f"|{self.graph.name}| Adding left constraint x{branching_var_idx} == {math.floor(branching_var_value)}",
             )
-        self.cplex_model.linear_constraints.add(
-            lin_expr=[[[f"x{branching_var_idx}"], [1.0]]],
-            senses=["E"],
-            rhs=right_hand_side,
-            names=[f"c{current_branch}"],
+        return self.add_branching_constraint(
+            branching_var_idx,
+            math.floor(branching_var_value),
+            depth,
         )
 
-    def add_right_constraint(self, branching_var: tuple, current_branch: int):
+    def add_right_constraint(self, branching_var: tuple, depth: int):
         branching_var_idx, branching_var_value = branching_var
-        right_hand_side = [math.ceil(branching_var_value)]
         if self.debug_mode:
             logger.info(
                 f"|{self.graph.name}| Adding right constraint x{branching_var_idx} == {math.ceil(branching_var_value)}",
             )
-        self.cplex_model.linear_constraints.add(
-            lin_expr=[[[f"x{branching_var_idx}"], [1.0]]],
-            senses=["E"],
-            rhs=right_hand_side,
-            names=[f"c{current_branch}"],
+        return self.add_branching_constraint(
+            branching_var_idx,
+            math.ceil(branching_var_value),
+            depth,
+        )
+
+    def backtrack(self):
+        """Return to the parent node: remove the branching row and node local cuts of the subtree"""
+        self.depth -= 1
+        self.constraint_registry.backtrack(self.depth)
+        branching_var_idx = self.branching_fixed_variables.pop()
+        del self.fixed_variables[branching_var_idx]
+        if self.branching_mode == "bound":
+            self.cplex_model.variables.set_lower_bounds(branching_var_idx, 0.0)
+            self.cplex_model.variables.set_upper_bounds(branching_var_idx, 1.0)
+        if self.debug_mode:
+            logger.info(
+                f"|{self.graph.name}| Backtrack to depth {self.depth}, {len(self.constraint_registry)} rows added",
+            )
+
+    def solve_node(self):
+        raise NotImplementedError
+
+    @timed("coloring_bound")
+    def is_pruned_by_coloring(self) -> bool:
+        """Check if the current node can not improve the incumbent without LP solve
+
+        Clique of the node consists of vertexes fixed to 1 and candidates: not fixed vertexes
+        adjacent to all of them. Greedy coloring of candidates bounds the clique size.
+        """
+        fixed_to_one = [
+            idx for idx, value in self.fixed_variables.items() if value > 0.5
+        ]
+        # vertexes removed by the reduction after the node was created make its LP infeasible
+        if vertices_to_bits(fixed_to_one) & self.removed_vertexes:
+            self.lp_solves_avoided_num += 1
+            return True
+        if not self.use_coloring_bound:
+            return False
+        fixed_bits = vertices_to_bits(self.fixed_variables)
+        candidates = (
+            self.graph.common_neighbors(fixed_to_one)
+            & ~fixed_bits
+            & ~self.removed_vertexes
+        )
+        # the node is infeasible if fixed to 1 vertexes are not a clique
+        is_pruned = not self.graph.is_clique(fixed_to_one) or (
+            len(fixed_to_one)
+            + coloring_bound(
+                self.graph.adjacency,
+                candidates,
+                limit=self.maximum_clique_size - len(fixed_to_one),
+            )
+            <= self.maximum_clique_size
+        )
+        if is_pruned:
+            self.lp_solves_avoided_num += 1
+            if self.debug_mode:
+                logger.info(
+                    f"|{self.graph.name}| Skip Branch by coloring bound at depth {self.depth}",
+                )
+        return is_pruned
+
+    def apply_bound_changes(self, bound_changes):
+        """Fix variables of the node by bounds (lb = ub = value), release previously fixed ones to [0, 1]"""
+        fixed_variables = dict(bound_changes)
+        changed_variables = (
+            fixed_variables.keys() | self.fixed_variables.keys()
+        )
+        if changed_variables:
+            self.cplex_model.variables.set_lower_bounds(
+                [
+                    (idx, fixed_variables.get(idx, 0.0))
+                    for idx in changed_variables
+                ],
+            )
+            self.cplex_model.variables.set_upper_bounds(
+                [
+                    (idx, fixed_variables.get(idx, 1.0))
+                    for idx in changed_variables
+                ],
+            )
+        self.fixed_variables = fixed_variables
+
+    def run_search(self, recursive_search):
+        """Run recursive_search or the iterative search (depends on search_strategy) and log the nodes throughput"""
+        start_time = time.time()
+        if (
+            self.known_upper_bound is not None
+            and self.maximum_clique_size >= self.known_upper_bound
+        ):
+            logger.info(
+                f"|{self.graph.name}| Incumbent {self.maximum_clique_size} reaches the known upper bound, "
+                f"no search is needed",
+            )
+        elif (
+            self.search_strategy == "recursive" and self.resumed_nodes is None
+        ):
+            recursive_search()
+        else:
+            self.search()
+        self.search_time = time.time() - start_time
+        self.update_result_bounds()
+        logger.info(
+            f"|{self.graph.name}| Search: {self.nodes_num} nodes, {self.branch_num} branchings, "
+            f"{self.nodes_num / max(self.search_time, 1e-9):.1f} nodes per second, "
+            f"{self.lp_solves_num} LP solves, {self.lp_solves_avoided_num} LP solves avoided by coloring bound, "
+            f"{self.primal_heuristic_improvements_num} of {self.primal_heuristic_calls_num} primal heuristic calls improved the incumbent",
+        )
+        logger.info(
+            f"|{self.graph.name}| Statistics: {self.statistics()['times']}",
+        )
+
+    def search(self):
+        """Iterative tree search over the explicit queue of open nodes
+
+        Each node is defined by its variables bound changes, which are applied to the model
+        before the node LP solve (no branching rows are added). Node local cuts of the
+        nodes at the same or deeper level are removed from the model before the solve.
+        """
+        # the recursive search can not start from given nodes, the depth first one does
+        self.node_queue = NodeQueue(
+            (
+                "depth_first"
+                if self.search_strategy == "recursive"
+                else self.search_strategy
+            ),
+        )
+        if self.resumed_nodes is not None:
+            self.node_queue.push(self.resumed_nodes)
+            self.resumed_nodes = None
+        else:
+            self.node_queue.push(
+                [SearchNode((), float(self.graph.vertices_num), 0)],
+            )
+        while self.node_queue:
+            if self.is_limit_reached():
+                self.skip_node(self.node_queue.best_bound())
+                if self.checkpoint_path is not None:
+                    self.save_checkpoint()
+                break
+            if (
+                self.checkpoint_path is not None
+                and time.time() - self.last_checkpoint_time
+                >= self.checkpoint_interval
+            ):
+                self.save_checkpoint()
+            node = self.node_queue.pop()
+            # incumbent could be improved after the node was created
+            if not self.current_solution_is_best(node.lp_bound):
+                continue
+            self.depth = node.depth
+            self.lp_bounds[node.depth - 1] = node.lp_bound
+            self.constraint_registry.backtrack(node.depth - 1)
+            self.apply_bound_changes(node.bound_changes)
+            nodes_num = self.nodes_num
+            node_solution = self.solve_node()
+            if node_solution is None:
+                if self.nodes_num == nodes_num and self.status is not None:
+                    # the limit is reached before the node is solved: it stays open (e.g. for the checkpoint)
+                    self.node_queue.push([node])
+                continue
+
+            self.branch_num += 1
+            current_objective_value, current_values = node_solution
+            branching_var_idx, branching_var_value = self.get_branching_var(
+                current_values,
+            )
+            children = [
+                SearchNode(
+                    node.bound_changes + ((branching_var_idx, value),),
+                    current_objective_value,
+                    node.depth + 1,
+                )
+                for value in (1.0, 0.0)
+            ]
+            # go to right branch first if value closer to 1
+            if not round(branching_var_value):
+                children.reverse()
+            self.node_queue.push(children)
+        self.depth = 0
+        self.constraint_registry.backtrack(0)
+        self.apply_bound_changes(())
+        # the search is finished, nothing to resume
+        if (
+            self.status is None
+            and self.checkpoint_path is not None
+            and osp.exists(self.checkpoint_path)
+        ):
+            os.remove(self.checkpoint_path)
+
+    def model_rows(self, indices):
+        """Vertexes of the model rows (all rows are sums of x_i)"""
+        if not len(indices):
+            return []
+        return [
+            tuple(row.ind)
+            for row in self.cplex_model.linear_constraints.get_rows(indices)
+        ]
+
+    def checkpoint_cuts(self):
+        """Cuts to be saved to the checkpoint (solvers with a cut pool override it)"""
+        return []
+
+    def restore_cuts(self, cuts):
+        pass
+
+    @timed("checkpoint")
+    def save_checkpoint(self):
+        """Dump the search state to checkpoint_path (compressed .npz of arrays)
+
+        Open nodes, incumbent and cuts are saved together with the model construction
+        rows and rows of edge changes, so the resumed run needs no independent sets
+        generation. Global rows of the reduction by incumbent are not saved: the
+        reduction runs again on resume.
+        """
+        start_time = time.time()
+        registry = self.constraint_registry
+        if self.base_rows is None:
+            self.base_rows = sets_to_csr(
+                self.model_rows(
+                    list(range(registry.base_rows_num))
+                    + registry.indices(self.edge_change_row_ids),
+                ),
+            )
+        nodes = self.node_queue.nodes()
+        bound_changes = [node.bound_changes for node in nodes]
+        node_offsets, node_variables = sets_to_csr(
+            [[idx for idx, _ in changes] for changes in bound_changes],
+        )
+        arrays = dict(
+            original_vertexes=(
+                np.arange(self.graph.vertices_num)
+                if self.graph.original_vertexes is None
+                else self.graph.original_vertexes
+            ),
+            incumbent=np.flatnonzero(
+                np.isclose(self.best_solution, 1.0, atol=self.eps),
+            ),
+            counters=np.array(
+                [
+                    self.nodes_num,
+                    self.branch_num,
+                    self.lp_solves_num,
+                    self.lp_solves_avoided_num,
+                ],
+            ),
+            base_rows_offsets=self.base_rows[0],
+            base_rows=self.base_rows[1],
+            node_offsets=node_offsets,
+            node_variables=node_variables,
+            node_values=np.array(
+                [value for changes in bound_changes for _, value in changes],
+                dtype=np.int8,
+            ),
+            node_lp_bounds=np.array(
+                [node.lp_bound for node in nodes],
+                dtype=float,
+            ),
+            node_depths=np.array(
+                [node.depth for node in nodes], dtype=np.int32
+            ),
+        )
+        arrays["cuts_offsets"], arrays["cuts"] = sets_to_csr(
+            self.checkpoint_cuts(),
+        )
+        os.makedirs(osp.dirname(self.checkpoint_path) or ".", exist_ok=True)
+        # write to a temporary file first, so the previous checkpoint survives a crash
+        temporary_path = f"{self.checkpoint_path}.tmp"
+        with open(temporary_path, "wb") as file:
+            np.savez_compressed(file, **arrays)
+        os.replace(temporary_path, self.checkpoint_path)
+        self.last_checkpoint_time = time.time()
+        logger.info(
+            f"|{self.graph.name}| Checkpoint: {len(nodes)} open nodes, incumbent {self.maximum_clique_size} "
+            f"saved in {self.last_checkpoint_time - start_time:.3f} seconds",
         )
 
+    def restore_checkpoint(self, checkpoint):
+        """Continue the search from the checkpoint (see save_checkpoint)
+
+        The solver should be constructed for the checkpoint graph (see algorithms.restore_solver)
+        with the checkpoint incumbent as initial_clique.
+        """
+        (
+            self.nodes_num,
+            self.branch_num,
+            self.lp_solves_num,
+            self.lp_solves_avoided_num,
+        ) = checkpoint["counters"].tolist()
+        self.restore_cuts(
+            csr_to_sets(checkpoint["cuts_offsets"], checkpoint["cuts"])
+        )
+        node_values = checkpoint["node_values"].tolist()
+        node_offsets = checkpoint["node_offsets"].tolist()
+        self.resumed_nodes = [
+            SearchNode(
+                tuple(zip(variables, node_values[start:end])),
+                lp_bound,
+                depth,
+            )
+            for variables, start, end, lp_bound, depth in zip(
+                csr_to_sets(
+                    checkpoint["node_offsets"],
+                    checkpoint["node_variables"],
+                ),
+                node_offsets[:-1],
+                node_offsets[1:],
+                checkpoint["node_lp_bounds"].tolist(),
+                checkpoint["node_depths"].tolist(),
+            )
+        ]
+        logger.info(
+            f"|{self.graph.name}| Resumed from checkpoint: {len(self.resumed_nodes)} open nodes, "
+            f"incumbent {len(checkpoint['incumbent'])}",
+        )
+
+    def drop_broken_cuts(self, added_edges):
+        """Remove cuts with both ends of an inserted edge (solvers with a cut pool override it)"""
+        pass
+
+    def update_model(self, added_edges, removed_edges):
+        """Update the model rows in place after the graph edge changes (see apply_edge_changes)
+
+        Rows with both ends of an inserted edge are found by the columns of the edge
+        ends and deleted: construction rows are replaced by their independent subsets,
+        added rows (cuts, complement edges) are not. Every deleted edge gets its row.
+
+        Returns:
+        dict: numbers of deleted and added rows
+        """
+        registry = self.constraint_registry
+        # the reduction depends on the graph and on the incumbent, it runs again in the next solve
+        registry.remove(self.reduction_row_ids)
+        self.reduction_row_ids = []
+        self.removed_vertexes = 0
+        self.reduced_clique_size = 0
+        self.drop_broken_cuts(added_edges)
+        broken_rows = set()
+        new_rows = set()
+        if len(added_edges):
+            added_edges = added_edges.tolist()
+            ends = sorted({vertex for edge in added_edges for vertex in edge})
+            ends_rows = {
+                vertex: set(column.ind)
+                for vertex, column in zip(
+                    ends,
+                    self.cplex_model.variables.get_cols(ends),
+                )
+            }
+            for u, v in added_edges:
+                broken_rows |= ends_rows[u] & ends_rows[v]
+            for vertexes in self.model_rows(
+                [idx for idx in broken_rows if idx < registry.base_rows_num],
+            ):
+                new_rows.update(
+                    MCPGraph.independent_subsets(vertexes, added_edges),
+                )
+            registry.remove_indices(broken_rows)
+        new_rows.update(map(tuple, removed_edges.tolist()))
+        self.edge_change_row_ids = [
+            row_id for row_id in self.edge_change_row_ids if row_id in registry
+        ] + registry.add(sorted(new_rows))
+        # checkpoint rows are collected again
+        self.base_rows = None
+        return {"deleted_rows": len(broken_rows), "added_rows": len(new_rows)}
+
+    def reset_search(self):
+        """Forget the search results and statistics before the next solve"""
+        self.stats = SolverStats(self.stats.sample_interval)
+        self.best_solution = []
+        self.maximum_clique_size = 0
+        self.branch_num = 0
+        self.nodes_num = 0
+        self.search_time = 0
+        self.lp_solves_num = 0
+        self.lp_solves_avoided_num = 0
+        self.primal_heuristic_calls_num = 0
+        self.primal_heuristic_improvements_num = 0
+        self.heuristic_history = []
+        self.status = None
+        self.upper_bound = None
+        self.gap = None
+        self.lp_bounds = dict()
+        self.open_subtree_bounds = dict()
+        self.depth = 0
+        self.resumed_nodes = None
+
+    def apply_edge_changes(self, added_edges=(), removed_edges=()):
+        """Warm start of the next solve on the graph with inserted and deleted edges
+
+        The graph and the model are updated in place (see MCPGraph.apply_edge_changes and
+        update_model), so neither independent sets generation nor model construction run
+        again. The best clique seeds the next solve if it is still a clique. Deleted edges
+        can not make cliques bigger: without inserted edges the upper bound stays valid
+        and the next solve stops as soon as the incumbent reaches it. A clique bigger than
+        the previous optimum has an inserted edge, so if the previous clique is kept only
+        the subtrees with both ends of an inserted edge fixed to 1 are searched. Changes
+        applied one after another without a solve between them are warm started together.
+
+        Parameters:
+        added_edges (iterable): (u, v) pairs of inserted edges
+        removed_edges (iterable): (u, v) pairs of deleted edges
+
+        Returns:
+        dict: numbers of changed edges and of deleted and added model rows
+
+        """
+        start_time = time.perf_counter()
+        if self.is_warm_start_pending:
+            # no solve since the previous changes: their warm start is updated
+            previous_clique = list(self.initial_clique or [])
+            previous_upper_bound = self.known_upper_bound
+            # search nodes of inserted edges (None - full search)
+            search_nodes = self.resumed_nodes
+        else:
+            previous_clique = np.flatnonzero(
+                np.isclose(self.best_solution, 1.0, atol=self.eps),
+            ).tolist()
+            previous_upper_bound = self.upper_bound
+            search_nodes = [] if self.status == "optimal" else None
+        added_edges, removed_edges = self.graph.apply_edge_changes(
+            added_edges,
+            removed_edges,
+        )
+        summary = {
+            "added_edges": len(added_edges),
+            "removed_edges": len(removed_edges),
+        }
+        summary.update(self.update_model(added_edges, removed_edges))
+        self.reset_search()
+        # an empty clique is not a seed: the initial heuristic runs
+        self.initial_clique = (
+            previous_clique
+            if previous_clique and self.graph.is_clique(previous_clique)
+            else None
+        )
+        self.known_upper_bound = (
+            previous_upper_bound if not len(added_edges) else None
+        )
+        if search_nodes is not None and self.initial_clique is not None:
+            # nodes of inserted edges which are deleted again are dropped
+            nodes = {
+                node.bound_changes: node
+                for node in search_nodes
+                if self.graph.is_clique(
+                    [vertex for vertex, _ in node.bound_changes],
+                )
+            }
+            for u, v in added_edges.tolist():
+                node = SearchNode(
+                    ((u, 1.0), (v, 1.0)),
+                    float(self.graph.vertices_num),
+                    1,
+                )
+                nodes[node.bound_changes] = node
+            self.resumed_nodes = list(nodes.values())
+        self.is_warm_start_pending = True
+        self.stats.add_time("edge_changes", time.perf_counter() - start_time)
+        logger.info(
+            f"|{self.graph.name}| Edge changes: {summary}, previous clique "
+            f"{'is kept' if self.initial_clique is not None else 'is broken'}, "
+            f"{'full search' if self.resumed_nodes is None else 'search of inserted edges'} "
+            f"in {time.perf_counter() - start_time:.3f} seconds",
+        )
+        return summary
+
+    @timed("reduction")
+    def reduce_by_incumbent(self):
+        """Fix to 0 vertexes which can not be in a clique bigger than the incumbent
+
+        Reduction runs again only when the incumbent is improved, removed vertexes are
+        fixed by one global row sum(x_i) <= 0.
+        """
+        if self.maximum_clique_size <= self.reduced_clique_size:
+            return
+        self.reduced_clique_size = self.maximum_clique_size
+        removed = self.graph.reducible_vertexes(
+            self.maximum_clique_size + 1,
+            removed=self.removed_vertexes,
+        )
+        if not removed:
+            return
+        self.removed_vertexes |= removed
+        vertexes = bits_to_vertices(removed)
+        self.reduction_row_ids += self.constraint_registry.add_rows(
+            lin_expr=[[vertexes, [1.0] * len(vertexes)]],
+            senses=["L"],
+            rhs=[0.0],
+        )
+        logger.info(
+            f"|{self.graph.name}| Reduction by incumbent {self.maximum_clique_size}: "
+            f"{len(vertexes)} vertexes fixed to 0, {popcount(self.removed_vertexes)} in total",
+        )
+
+    @timed("primal_heuristic")
+    def run_primal_heuristic(self, current_values):
+        """Round the node LP solution to a clique and update the incumbent if it is bigger"""
+        if (
+            self.primal_heuristic_frequency <= 0
+            or self.lp_solves_num % self.primal_heuristic_frequency
+            or (
+                self.primal_heuristic_max_depth is not None
+                and self.depth > self.primal_heuristic_max_depth
+            )
+        ):
+            return
+        self.primal_heuristic_calls_num += 1
+        clique = bits_to_vertices(
+            rounding_clique(
+                self.graph.adjacency,
+                current_values,
+                self.graph.degrees,
+            ),
+        )
+        if len(clique) <= self.maximum_clique_size:
+            return
+        self.primal_heuristic_improvements_num += 1
+        self.best_solution = [0] * self.graph.vertices_num
+        for vertex in clique:
+            self.best_solution[vertex] = 1
+        self.maximum_clique_size = len(clique)
+        if self.debug_mode:
+            logger.info(
+                f"|{self.graph.name}| Best Solution updated by primal heuristic. New value is {self.maximum_clique_size}",
+            )
+
     def current_solution_is_best(self, current_objective_value):
         current_objective_value = (
             math.ceil(current_objective_value)
@@ -109,6 +883,7 @@ class MaxCliqueSolver:
             else current_objective_value
         )
         if current_objective_value <= self.maximum_clique_size:
+            self.stats.count("pruned_by_lp_bound")
             if self.debug_mode:
                 logger.info(
                     f"|{self.graph.name}| Skip Branch with MCP size {current_objective_value}!",
@@ -145,12 +920,15 @@ class MaxCliqueSolver:
     def init_model_with_heuristic_solution(self):
         # helper function
         def generate_init_best_solution(best_heuristic_sol):
-            solution = np.zeros(len(self.graph.nodes))
+            solution = np.zeros(self.graph.vertices_num)
             solution[list(best_heuristic_sol)] = 1
             return solution
 
         # apply greedy heuristic first
-        best_heuristic_sol, _ = self.initial_heuristic()
+        if self.initial_clique is not None:
+            best_heuristic_sol = set(self.initial_clique)
+        else:
+            best_heuristic_sol = self.initial_heuristic()
         is_clique = self.is_clique(list(best_heuristic_sol))
         if is_clique:
             logger.info(f"Initial heuristic solution is clique!")
@@ -167,44 +945,22 @@ class MaxCliqueSolver:
         else:
             logger.info(f"Initial heuristic solution is not clique!")
             raise Exception("The Initial Heuristic has a mistake !!!")
+        if self.cutoff > self.maximum_clique_size:
+            # best_solution stays empty if there is no clique bigger than cutoff
+            self.best_solution = np.zeros(self.graph.vertices_num)
+            self.maximum_clique_size = self.cutoff
 
-    @timeit
+    @timed("initial_heuristic")
     def initial_heuristic(self):
-        """Greedy Init Heuristic
+        """Greedy clique from every vertex improved by the local search
+
+        Returns:
+        set: vertexes of the best found clique
 
-        # :return:
-        # Max Clique by Heuristic: set
         """
         logger.info("Initial heuristic working")
-        best_clique = set()
-        for vertex in self.graph.nodes:
-            current_clique = set()
-            current_clique.add(vertex)
-            vertexes_degree = {
-                vertex: self.graph.graph.degree(vertex)
-                for vertex in self.graph.graph.neighbors(vertex)
-            }
-            while True:
-                max_degree_vertex = max(
-                    vertexes_degree,
-                    key=vertexes_degree.get,
-                )
-                current_clique.add(max_degree_vertex)
-
-                max_degree_vertex_neighbors = {
-                    vertex: self.graph.graph.degree(vertex)
-                    for vertex in self.graph.graph.neighbors(max_degree_vertex)
-                }
-
-                vertexes_degree = {
-                    vertex: vertexes_degree[vertex]
-                    for vertex in set(vertexes_degree).intersection(
-                        set(max_degree_vertex_neighbors),
-                    )
-                }
-                if not vertexes_degree:
-                    break
-
-            if len(current_clique) > len(best_clique):
-                best_clique = current_clique
-        return best_clique
+        clique, self.heuristic_history = heuristic_clique(
+            self.graph,
+            self.heuristic_time_limit,
+        )
+        return clique
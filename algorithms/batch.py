@@ -0,0 +1,149 @@
+from collections import namedtuple
+import numpy as np
+from algorithms import get_solver_class
+from algorithms.base import cplex
+from graph import MCPGraph
+from utils import *
+
+# instance index in the batch, clique vertexes, solver name, search status, upper bound and seconds
+BatchResult = namedtuple(
+    "BatchResult",
+    ["index", "clique", "solver", "status", "upper_bound", "time"],
+)
+
+# LP bounds pay off only on big dense graphs, smaller or sparser ones are solved by MCS
+LP_MIN_VERTICES = 300
+LP_MIN_DENSITY = 0.9
+# modules whose logs are disabled while a batch instance is solved
+LOGGING_MODULES = ["algorithms", "graph", "utils", "coloring"]
+
+
+def batch_graph(instance) -> MCPGraph:
+    """Graph of the batch instance
+
+    The instance kind is given by its type, ambiguous input is rejected: an edge list
+    of two edges is a square array too, so edge lists are not accepted as arrays.
+
+    Parameters:
+    instance: adjacency matrix (square bool or 0/1 np.ndarray with zero diagonal)
+              or (vertexes number, edge list of 0-based vertexes) pair
+
+    Returns:
+    MCPGraph: the graph
+
+    """
+    if isinstance(instance, np.ndarray):
+        if not (
+            instance.ndim == 2
+            and instance.shape[0] == instance.shape[1]
+            and np.isin(instance, (0, 1)).all()
+            and not instance.diagonal().any()
+        ):
+            raise ValueError(
+                f"Array of shape {instance.shape} is not an adjacency matrix "
+                f"(square bool or 0/1 with zero diagonal), "
+                f"edge lists are given as (vertexes number, edges) pairs",
+            )
+        return MCPGraph(instance)
+    if (
+        isinstance(instance, tuple)
+        and len(instance) == 2
+        and np.isscalar(instance[0])
+    ):
+        vertices_num, edges = instance
+        return MCPGraph.from_edges(int(vertices_num), edges)
+    raise ValueError(
+        f"Wrong batch instance type {type(instance)}: should be an adjacency matrix "
+        f"(np.ndarray) or (vertexes number, edges) pair",
+    )
+
+
+def choose_solver(graph: MCPGraph) -> str:
+    """Solver name by the graph size and density (MCS if cplex is not installed)"""
+    vertices_num = graph.vertices_num
+    density = sum(graph.degrees) / max(vertices_num * (vertices_num - 1), 1)
+    if (
+        vertices_num < LP_MIN_VERTICES
+        or density < LP_MIN_DENSITY
+        or cplex is None
+    ):
+        return "MCS"
+    return "BnC"
+
+
+def solve_batch(
+    instances,
+    solver_name: str = None,
+    time_limit: float = None,
+    node_limit: int = None,
+    heuristic_time_limit: float = 0.0,
+    iteration_number: int = 5,
+    seed: int = None,
+    quiet: bool = True,
+    **solver_options,
+):
+    """Solve graphs one by one in this process and yield the result of every graph when it is solved
+
+    The per instance overhead is kept small: no networkx graph and no complement edges
+    are built, independent sets are generated by iteration_number coloring rounds
+    without the on-disk cache, and the CPLEX problem of every LP solver is reused by
+    its next instance instead of a new CPLEX environment.
+
+    Parameters:
+    instances (iterable): graphs as adjacency matrices or (vertexes number, edges) pairs (see batch_graph)
+    solver_name (str): solver of all instances (None - chosen per instance by choose_solver)
+    time_limit (float), node_limit (int): limits of every instance solve
+    heuristic_time_limit (float): local search time of the initial heuristic (0 - greedy only)
+    iteration_number (int): coloring rounds of independent sets generation for LP solvers
+    seed (int): random seed of independent sets generation
+    quiet (bool): disable solvers logging while instances are solved
+    solver_options: other solver parameters (LP solvers only)
+
+    Returns:
+    generator: BatchResult of every instance in the input order
+
+    """
+    cplex_models = dict()
+    try:
+        for index, instance in enumerate(instances):
+            if quiet:
+                for module in LOGGING_MODULES:
+                    logger.disable(module)
+            try:
+                start_time = time.time()
+                graph = batch_graph(instance)
+                name = solver_name or choose_solver(graph)
+                options = dict(heuristic_time_limit=heuristic_time_limit)
+                if name != "MCS":
+                    graph.prepare_constraints(
+                        filter_not_connected=name == "BnB",
+                        use_cache=False,
+                        iteration_number=iteration_number,
+                        seed=seed,
+                    )
+                    options.update(
+                        solver_options,
+                        cplex_model=cplex_models.get(name),
+                    )
+                solver = get_solver_class(name)(graph=graph, **options)
+                solver.solve(time_limit, node_limit)
+                if name != "MCS":
+                    cplex_models[name] = solver.cplex_model
+                clique = np.flatnonzero(
+                    np.isclose(solver.best_solution, 1.0, atol=1e-5),
+                ).tolist()
+            finally:
+                if quiet:
+                    for module in LOGGING_MODULES:
+                        logger.enable(module)
+            yield BatchResult(
+                index,
+                clique,
+                name,
+                solver.status,
+                solver.upper_bound,
+                round(time.time() - start_time, 6),
+            )
+    finally:
+        for problem in cplex_models.values():
+            problem.end()
@@ -2,6 +2,7 @@ import math
 import cplex
 import numpy as np
 from algorithms.base import MaxCliqueSolver
+from algorithms.stats import timed
 from graph import MCPGraph
 from utils import *
 
@@ -21,80 +22,59 @@ class BNBSolver(MaxCliqueSolver):
         graph: MCPGraph,
         branching_strategy: str = "max",
         debug_mode: bool = False,
+        search_strategy: str = "recursive",
+        branching_mode: str = "constraint",
+        use_coloring_bound: bool = True,
+        heuristic_time_limit: float = 1.0,
+        primal_heuristic_frequency: int = 1,
+        primal_heuristic_max_depth: int = None,
+        initial_clique=None,
+        cutoff: int = 0,
+        threads: int = 0,
+        checkpoint_path: str = None,
+        checkpoint_interval: float = 60,
+        stats_sample_interval: float = None,
+        cplex_model=None,
     ):
         super(BNBSolver, self).__init__(
             graph=graph,
             branching_strategy=branching_strategy,
             debug_mode=debug_mode,
+            search_strategy=search_strategy,
+            branching_mode=branching_mode,
+            use_coloring_bound=use_coloring_bound,
+            heuristic_time_limit=heuristic_time_limit,
+            primal_heuristic_frequency=primal_heuristic_frequency,
+            primal_heuristic_max_depth=primal_heuristic_max_depth,
+            initial_clique=initial_clique,
+            cutoff=cutoff,
+            threads=threads,
+            checkpoint_path=checkpoint_path,
+            checkpoint_interval=checkpoint_interval,
+            stats_sample_interval=stats_sample_interval,
+            cplex_model=cplex_model,
         )
-        self.cplex_model = self.construct_model()
-        self.best_solution = []
-        self.maximum_clique_size = 0
-        self.eps = 1e-5
 
     def construct_model(self):
-        nodes_amount = len(self.graph.nodes)
-        obj = [1.0] * nodes_amount
-        upper_bounds = [1.0] * nodes_amount
-        lower_bounds = [0.0] * nodes_amount
-        types = ["C"] * nodes_amount
-        columns_names = [f"x{x}" for x in range(nodes_amount)]
-
-        not_connected_edges_amount = len(self.graph.not_connected_vertexes)
-        independent_vertex_sets_amount = len(
-            self.graph.independent_vertex_sets,
+        offsets, vertexes = sets_to_csr(self.graph.independent_vertex_sets)
+        not_connected = self.graph.not_connected_vertexes
+        # rows of independent sets x_0 + x_1 + ... + x_i <= 1, then rows of complement edges x_i + x_j <= 1
+        rows_offsets = np.concatenate(
+            (offsets, offsets[-1] + 2 * np.arange(1, len(not_connected) + 1)),
         )
-
-        right_hand_side = [1.0] * (
-            not_connected_edges_amount + independent_vertex_sets_amount
-        )
-        constraint_names = [
-            f"c{x}"
-            for x in range(
-                not_connected_edges_amount + independent_vertex_sets_amount,
-            )
-        ]
-        constraint_senses = ["L"] * (
-            not_connected_edges_amount + independent_vertex_sets_amount
-        )
-
-        problem = cplex.Cplex()
-        problem.set_results_stream(None)
-        problem.set_warning_stream(None)
-        problem.set_error_stream(None)
-        problem.objective.set_sense(problem.objective.sense.maximize)
-        problem.variables.add(
-            obj=obj,
-            ub=upper_bounds,
-            lb=lower_bounds,
-            names=columns_names,
-            types=types,
-        )
-
-        constraints = []
-        # set constraints for all vertexes in independent set x_0 + x_1 + ... +  x_i  <=1 with i = len(independent_set)
-        for ind_set in self.graph.independent_vertex_sets:
-            constraint = [[f"x{i}" for i in ind_set], [1.0] * len(ind_set)]
-            constraints.append(constraint)
-
-        # set constraints for not connected edges x_i + x_j <=1
-        for xi, xj in self.graph.not_connected_vertexes:
-            contraint = [[f"x{xi}", f"x{xj}"], [1.0, 1.0]]
-            constraints.append(contraint)
-
-        problem.linear_constraints.add(
-            lin_expr=constraints,
-            senses=constraint_senses,
-            rhs=right_hand_side,
-            names=constraint_names,
+        rows_vertexes = np.concatenate(
+            (vertexes, np.asarray(not_connected, dtype=np.int32).reshape(-1)),
         )
+        problem = self.construct_set_model(rows_offsets, rows_vertexes)
+        # complement edges are in the model now, no need to keep them in memory
+        self.graph.release_not_connected()
         return problem
 
-    @timeit
-    def solve(self):
+    @timed("solve")
+    def solve(self, time_limit: float = None, node_limit: int = None):
+        self.set_limits(time_limit, node_limit)
         self.init_model_with_heuristic_solution()
-        # branch&bound recursive algorithm
-        self.branching()
+        self.run_search(self.branching)
         solution_nodes = np.where(
             np.isclose(self.best_solution, 1.0, atol=1e-5),
         )
@@ -115,24 +95,35 @@ class BNBSolver(MaxCliqueSolver):
             if self.best_solution[idx] != 0:
                 logger.info(f"x_{idx} = {self.best_solution[idx]}")
 
-    def goto_left_branch(self, branching_var, cur_branch):
+    def goto_left_branch(self, branching_var):
         # Add Left constraints
-        self.add_left_constraint(branching_var, cur_branch)
+        self.depth += 1
+        self.add_left_constraint(branching_var, self.depth)
         self.branching()
-        self.cplex_model.linear_constraints.delete(f"c{cur_branch}")
-        if self.debug_mode:
-            logger.info(f"|{self.graph.name}| The c{cur_branch} deleted")
+        self.backtrack()
 
-    def goto_right_branch(self, branching_var, cur_branch):
+    def goto_right_branch(self, branching_var):
         # Add Right constraints
-        self.add_right_constraint(branching_var, cur_branch)
+        self.depth += 1
+        self.add_right_constraint(branching_var, self.depth)
         self.branching()
-        self.cplex_model.linear_constraints.delete(f"c{cur_branch}")
-        if self.debug_mode:
-            logger.info(f"|{self.graph.name}| The c{cur_branch} deleted")
-
-    def branching(self):
-        self.cplex_model.solve()
+        self.backtrack()
+
+    def solve_node(self):
+        """Solve LP of the current node
+
+        Returns:
+        (objective value, values) of the node LP if the node should be branched
+        else None (the node is pruned or its solution is integer)
+        """
+        if self.is_node_skipped():
+            return None
+        self.nodes_num += 1
+        self.sample_progress()
+        self.reduce_by_incumbent()
+        if self.is_pruned_by_coloring():
+            return None
+        self.solve_lp()
         # get the solution variables and objective value
         current_values = self.cplex_model.solution.get_values()
         current_objective_value = (
@@ -143,7 +134,7 @@ class BNBSolver(MaxCliqueSolver):
 
         # There is no sense in branching further
         if not self.current_solution_is_best(current_objective_value):
-            return
+            return None
 
         if all(
             [
@@ -152,21 +143,36 @@ class BNBSolver(MaxCliqueSolver):
             ],
         ):
             # Best Solution updated.
+            self.stats.count("integer_solutions")
             self.best_solution = [round(x) for x in current_values]
             self.maximum_clique_size = math.floor(current_objective_value)
             if self.debug_mode:
                 logger.info(
                     f"|{self.graph.name}| Best Solution updated. New value is {self.maximum_clique_size}",
                 )
+            return None
+        self.run_primal_heuristic(current_values)
+        # the incumbent could be improved by the heuristic
+        if not self.current_solution_is_best(current_objective_value):
+            return None
+        self.lp_bounds[self.depth] = current_objective_value
+        return current_objective_value, current_values
+
+    def branching(self):
+        node_solution = self.solve_node()
+        if node_solution is None:
             return
 
         self.branch_num += 1
-        cur_branch = self.branch_num
-        branching_var = self.get_branching_var(current_values)
+        branching_var = self.get_branching_var(node_solution[1])
+        # the second branch stays open while the first one is explored
+        self.open_subtree_bounds[self.depth] = node_solution[0]
         # go to  right branch if value closer to 1
         if round(branching_var[1]):
-            self.goto_right_branch(branching_var, cur_branch)
-            self.goto_left_branch(branching_var, cur_branch)
+            self.goto_right_branch(branching_var)
+            del self.open_subtree_bounds[self.depth]
+            self.goto_left_branch(branching_var)
         else:
-            self.goto_left_branch(branching_var, cur_branch)
-            self.goto_right_branch(branching_var, cur_branch)
+            self.goto_left_branch(branching_var)
+            del self.open_subtree_bounds[self.depth]
+            self.goto_right_branch(branching_var)
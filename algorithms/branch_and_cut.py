@@ -1,6 +1,8 @@
 import cplex
 import numpy as np
 from algorithms.base import MaxCliqueSolver
+from algorithms.stats import timed
+from algorithms.separation import CutPool, separate_clique_inequalities
 from graph import MCPGraph
 from utils import *
 import math
@@ -14,84 +16,108 @@ class BNCSolver(MaxCliqueSolver):
         graph: MCPGraph,
         branching_strategy: str = "max",
         debug_mode: bool = False,
+        search_strategy: str = "recursive",
+        branching_mode: str = "constraint",
+        use_coloring_bound: bool = True,
+        heuristic_time_limit: float = 1.0,
+        primal_heuristic_frequency: int = 1,
+        primal_heuristic_max_depth: int = None,
+        initial_clique=None,
+        cutoff: int = 0,
+        threads: int = 0,
+        checkpoint_path: str = None,
+        checkpoint_interval: float = 60,
+        stats_sample_interval: float = None,
+        cplex_model=None,
         tailing_off_time_threshold: int = 3600,
+        cut_max_age: int = 10,
+        cut_pool_size: int = 1000,
     ):
         super(BNCSolver, self).__init__(
             graph=graph,
             branching_strategy=branching_strategy,
             debug_mode=debug_mode,
+            search_strategy=search_strategy,
+            branching_mode=branching_mode,
+            use_coloring_bound=use_coloring_bound,
+            heuristic_time_limit=heuristic_time_limit,
+            primal_heuristic_frequency=primal_heuristic_frequency,
+            primal_heuristic_max_depth=primal_heuristic_max_depth,
+            initial_clique=initial_clique,
+            cutoff=cutoff,
+            threads=threads,
+            checkpoint_path=checkpoint_path,
+            checkpoint_interval=checkpoint_interval,
+            stats_sample_interval=stats_sample_interval,
+            cplex_model=cplex_model,
         )
-        self.cplex_model = self.construct_model()
-        self.best_solution = []
-        self.maximum_clique_size = 0
-        self.eps = 1e-5
         self.tailing_off_time_threshold = tailing_off_time_threshold
-
-    def construct_model(self):
-        nodes_amount = len(self.graph.nodes)
-        obj = [1.0] * nodes_amount
-        upper_bounds = [1.0] * nodes_amount
-        lower_bounds = [0.0] * nodes_amount
-        types = ["C"] * nodes_amount
-        columns_names = [f"x{x}" for x in range(nodes_amount)]
-
-        independent_vertex_sets_amount = len(
-            self.graph.independent_vertex_sets,
+        self.cut_pool = CutPool(
+            self.constraint_registry,
+            cut_max_age,
+            cut_pool_size,
+            self.eps,
         )
 
-        right_hand_side = [1.0] * independent_vertex_sets_amount
-        constraint_names = [
-            f"c{x}" for x in range(independent_vertex_sets_amount)
-        ]
-        constraint_senses = ["L"] * independent_vertex_sets_amount
-
-        problem = cplex.Cplex()
-        problem.set_results_stream(None)
-        problem.set_warning_stream(None)
-        problem.set_error_stream(None)
-        problem.objective.set_sense(problem.objective.sense.maximize)
-        problem.variables.add(
-            obj=obj,
-            ub=upper_bounds,
-            lb=lower_bounds,
-            names=columns_names,
-            types=types,
+    def statistics(self) -> dict:
+        self.stats.counters.update(
+            {
+                f"cut_pool_{key}": value
+                for key, value in self.cut_pool.statistics().items()
+            },
         )
+        return super(BNCSolver, self).statistics()
+
+    def checkpoint_cuts(self):
+        return list(self.cut_pool.cuts)
+
+    def restore_cuts(self, cuts):
+        # restored cuts are added to the model by separation when they are violated
+        for vertexes in cuts:
+            self.cut_pool.get_cut(vertexes)
+        self.cut_pool.shrink()
+
+    def drop_broken_cuts(self, added_edges):
+        # broken cuts are removed from the pool too, so separation does not add them back
+        edges_bits = [(1 << u) | (1 << v) for u, v in added_edges.tolist()]
+        broken_cuts = [
+            vertexes
+            for vertexes in self.cut_pool.cuts
+            if any(
+                vertices_to_bits(vertexes) & bits == bits
+                for bits in edges_bits
+            )
+        ]
+        self.cut_pool.remove(broken_cuts)
 
-        constraints = []
-        # set constraints for all vertexes in independent set x_0 + x_1 + ... +  x_i  <=1 with i = len(independent_set)
-        for ind_set in self.graph.independent_vertex_sets:
-            constraint = [[f"x{i}" for i in ind_set], [1.0] * len(ind_set)]
-            constraints.append(constraint)
-
-        problem.linear_constraints.add(
-            lin_expr=constraints,
-            senses=constraint_senses,
-            rhs=right_hand_side,
-            names=constraint_names,
-        )
-        return problem
-
-    def separation(self, solution, top_k: int = 2):
-        independent_sets = self.graph.independent_sets_generation(
-            minimum_set_size=2,
-            iteration_number=1,
-            max_weighted=True,
-            solution=solution,
-            strategies=[nx.coloring.strategy_random_sequential],
+    def construct_model(self):
+        # rows of independent sets x_0 + x_1 + ... + x_i <= 1
+        return self.construct_set_model(
+            *sets_to_csr(self.graph.independent_vertex_sets),
         )
-        sorted_set = sorted(
-            independent_sets,
-            key=lambda item: item[1],
-            reverse=True,
+
+    @timed("separation")
+    def separation(self, solution, top_k: int = 10):
+        """Most violated clique inequalities which are not in the model
+
+        Inactive cuts of the pool are checked first, then the weighted independent sets heuristic.
+        """
+        violated_cuts = self.cut_pool.violated_inactive_cuts(solution)
+        violated_cuts.extend(
+            cut
+            for cut in separate_clique_inequalities(
+                self.graph.adjacency,
+                solution,
+                eps=self.eps,
+            )
+            if not self.cut_pool.is_in_model(cut[0])
         )
-        top_k = min(top_k, len(sorted_set))
-        new_constraints = [ind_set[0] for ind_set in sorted_set][:top_k]
-        return new_constraints if len(new_constraints) else None
+        violated_cuts.sort(key=lambda cut: cut[1], reverse=True)
+        return violated_cuts[:top_k] if violated_cuts else None
 
     def get_solution(self):
         try:
-            self.cplex_model.solve()
+            self.solve_lp()
             # get the solution variables and objective value
             current_values = self.cplex_model.solution.get_values()
             current_objective_value = (
@@ -104,10 +130,11 @@ class BNCSolver(MaxCliqueSolver):
         except:
             return None, None
 
-    @timeit
-    def solve(self):
+    @timed("solve")
+    def solve(self, time_limit: float = None, node_limit: int = None):
+        self.set_limits(time_limit, node_limit)
         self.init_model_with_heuristic_solution()
-        self.branch_and_cut()
+        self.run_search(self.branch_and_cut)
         solution_nodes = np.where(
             np.isclose(self.best_solution, 1.0, atol=1e-5),
         )
@@ -122,73 +149,106 @@ class BNCSolver(MaxCliqueSolver):
                 f"Objective Value of MCP Problem (Maximum Clique Size): {self.maximum_clique_size}. It is not a clique!",
             )
             self.is_solution_is_clique = False
+        logger.info(f"Cut pool: {self.cut_pool.statistics()}")
 
-    @staticmethod
-    def get_complement_edges(subgraph):
-        graph_complement = nx.complement(subgraph)
-        return list(
-            filter(lambda edge: edge[0] != edge[1], graph_complement.edges()),
-        )
+    def get_complement_edges(self, nodelist):
+        return self.graph.not_connected_pairs(nodelist)
 
     def check_solution(self, curr_values):
         solution_nodes = np.where(np.isclose(curr_values, 1.0, atol=1e-5))
-        is_clique, subgraph = self.is_clique(solution_nodes[0].tolist())
-        return None if is_clique else self.get_complement_edges(subgraph)
+        nodelist = solution_nodes[0].tolist()
+        if self.is_clique(nodelist):
+            return None
+        return self.get_complement_edges(nodelist)
 
-    def goto_left_branch(self, branching_var, cur_branch):
+    def goto_left_branch(self, branching_var):
         # Add Left constraints
-        self.add_left_constraint(branching_var, cur_branch)
+        self.depth += 1
+        self.add_left_constraint(branching_var, self.depth)
         self.branch_and_cut()
-        self.cplex_model.linear_constraints.delete(f"c{cur_branch}")
-        if self.debug_mode:
-            logger.info(f"|{self.graph.name}| The c{cur_branch} deleted")
+        self.backtrack()
 
-    def goto_right_branch(self, branching_var, cur_branch):
+    def goto_right_branch(self, branching_var):
         # Add Right constraints
-        self.add_right_constraint(branching_var, cur_branch)
+        self.depth += 1
+        self.add_right_constraint(branching_var, self.depth)
         self.branch_and_cut()
-        self.cplex_model.linear_constraints.delete(f"c{cur_branch}")
-        if self.debug_mode:
-            logger.info(f"|{self.graph.name}| The c{cur_branch} deleted")
-
-    def branch_and_cut(self):
-        current_objective_value, current_values = self.get_solution()
-        if current_objective_value is None:
-            return
-        # There is no sense in branching further
-        if not self.current_solution_is_best(current_objective_value):
-            return
-        start_time = time.time()
-        while time.time() - start_time <= self.tailing_off_time_threshold:
-            new_constraints = self.separation(current_values)
-            if new_constraints is None:
-                if self.debug_mode:
-                    logger.info("No more new separations! ")
-                break
-            self.add_multiple_constraints(new_constraints)
+        self.backtrack()
+
+    def solve_node(self):
+        """Solve LP of the current node with cutting planes
+
+        Returns:
+        (objective value, values) of the node LP if the node should be branched
+        else None (the node is pruned, infeasible or its solution is a clique)
+        """
+        if self.is_node_skipped():
+            return None
+        self.nodes_num += 1
+        self.sample_progress()
+        self.reduce_by_incumbent()
+        if self.is_pruned_by_coloring():
+            return None
+        while True:
             current_objective_value, current_values = self.get_solution()
             if current_objective_value is None:
-                return
+                self.stats.count("infeasible")
+                return None
+            # There is no sense in branching further
             if not self.current_solution_is_best(current_objective_value):
-                return
-
-        self.branch_num += 1
-        cur_branch = self.branch_num
-        branching_var = self.get_branching_var(current_values)
-        if branching_var == -1:
+                return None
+            start_time = time.time()
+            while (
+                time.time() - start_time <= self.tailing_off_time_threshold
+                and not self.is_limit_reached()
+            ):
+                new_constraints = self.separation(current_values)
+                if new_constraints is None:
+                    if self.debug_mode:
+                        logger.info("No more new separations! ")
+                    break
+                # cuts of the root node are global, the deeper ones are node local
+                self.cut_pool.add(new_constraints, self.depth or None)
+                current_objective_value, current_values = self.get_solution()
+                if current_objective_value is None:
+                    self.stats.count("infeasible")
+                    return None
+                self.cut_pool.update_ages(current_values)
+                if not self.current_solution_is_best(current_objective_value):
+                    return None
+
+            if self.get_branching_var(current_values) != -1:
+                self.run_primal_heuristic(current_values)
+                # the incumbent could be improved by the heuristic
+                if not self.current_solution_is_best(current_objective_value):
+                    return None
+                self.lp_bounds[self.depth] = current_objective_value
+                return current_objective_value, current_values
             broken_constraints = self.check_solution(current_values)
-            if broken_constraints is not None:
-                self.add_multiple_constraints(broken_constraints)
-                self.branch_and_cut()
-            else:
+            if broken_constraints is None:
+                self.stats.count("integer_solutions")
                 self.best_solution = [round(x) for x in current_values]
                 self.maximum_clique_size = math.floor(current_objective_value)
+                return None
+            # integer solution is not a clique: add its complement edges and solve the node again
+            self.stats.count("complement_edges_added", len(broken_constraints))
+            self.add_multiple_constraints(broken_constraints)
+
+    def branch_and_cut(self):
+        node_solution = self.solve_node()
+        if node_solution is None:
             return
 
+        self.branch_num += 1
+        branching_var = self.get_branching_var(node_solution[1])
+        # the second branch stays open while the first one is explored
+        self.open_subtree_bounds[self.depth] = node_solution[0]
         # go to  right branch if value closer to 1
         if round(branching_var[1]):
-            self.goto_right_branch(branching_var, cur_branch)
-            self.goto_left_branch(branching_var, cur_branch)
+            self.goto_right_branch(branching_var)
+            del self.open_subtree_bounds[self.depth]
+            self.goto_left_branch(branching_var)
         else:
-            self.goto_left_branch(branching_var, cur_branch)
-            self.goto_right_branch(branching_var, cur_branch)
+            self.goto_left_branch(branching_var)
+            del self.open_subtree_bounds[self.depth]
+            self.goto_right_branch(branching_var)
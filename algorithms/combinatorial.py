@@ -0,0 +1,167 @@
+import numpy as np
+from algorithms.base import MaxCliqueSolver
+from algorithms.stats import timed
+from coloring import smallest_last_order
+from graph import MCPGraph
+from utils import *
+
+
+class MCSSolver(MaxCliqueSolver):
+    """
+    Combinatorial branch and bound without LP (bitset MCQ/MCS style).
+    The solver work pipeline:
+        1. Initial Heuristic
+        2. Vertexes renumbering in degeneracy (smallest last) order
+        3. Recursive branch and bound with greedy coloring bounds
+    """
+
+    def __init__(
+        self,
+        graph: MCPGraph,
+        debug_mode: bool = False,
+        heuristic_time_limit: float = 1.0,
+        initial_clique=None,
+        cutoff: int = 0,
+        stats_sample_interval: float = None,
+    ):
+        super(MCSSolver, self).__init__(
+            graph=graph,
+            debug_mode=debug_mode,
+            heuristic_time_limit=heuristic_time_limit,
+            initial_clique=initial_clique,
+            cutoff=cutoff,
+            stats_sample_interval=stats_sample_interval,
+        )
+        # the search works on renumbered vertexes: bit i is the vertex order[i]
+        self.order = smallest_last_order(self.graph.adjacency)
+        self.adjacency = self.graph.permuted_adjacency(self.order)
+        self.current_clique = []
+        # color of the current vertex of the first level bounds the cliques left to search
+        self.root_color = self.graph.vertices_num
+
+    def construct_model(self):
+        return None
+
+    def update_model(self, added_edges, removed_edges):
+        # there is no model, the vertexes order is built again for the changed graph
+        self.order = smallest_last_order(self.graph.adjacency)
+        self.adjacency = self.graph.permuted_adjacency(self.order)
+        self.root_color = self.graph.vertices_num
+        return {}
+
+    @timed("solve")
+    def solve(self, time_limit: float = None, node_limit: int = None):
+        self.set_limits(time_limit, node_limit)
+        self.init_model_with_heuristic_solution()
+        self.run_search(self.branching)
+        solution_nodes = np.where(
+            np.isclose(self.best_solution, 1.0, atol=1e-5),
+        )
+
+        # log result
+        if self.is_clique(solution_nodes[0].tolist()):
+            logger.info(
+                f"Maximum Clique Size: {self.maximum_clique_size}. It is a clique!",
+            )
+            self.is_solution_is_clique = True
+        else:
+            logger.info(
+                f"Maximum Clique Size: {self.maximum_clique_size}. It is not a clique!",
+            )
+            self.is_solution_is_clique = False
+
+    def color_sort(self, candidates: int, min_color: int):
+        """Greedy coloring of candidates, one color class at a time in the vertexes order
+
+        Returns:
+        list: vertexes with color >= min_color in non decreasing color order
+        list: their colors
+        """
+        adjacency = self.adjacency
+        vertices, colors = [], []
+        color = 0
+        uncolored = candidates
+        while uncolored:
+            color += 1
+            available = uncolored
+            while available:
+                lowest_bit = available & -available
+                vertex = lowest_bit.bit_length() - 1
+                uncolored ^= lowest_bit
+                available &= ~adjacency[vertex]
+                available ^= lowest_bit
+                if color >= min_color:
+                    vertices.append(vertex)
+                    colors.append(color)
+        return vertices, colors
+
+    def update_best_solution(self):
+        self.maximum_clique_size = len(self.current_clique)
+        self.best_solution = [0] * self.graph.vertices_num
+        for vertex in self.current_clique:
+            self.best_solution[self.order[vertex]] = 1
+        if self.debug_mode:
+            logger.info(
+                f"|{self.graph.name}| Best Solution updated. New value is {self.maximum_clique_size}",
+            )
+
+    def sample_progress(self):
+        if self.stats.is_sample_due():
+            self.stats.sample(
+                self.nodes_num,
+                self.maximum_clique_size,
+                max(self.root_color, self.maximum_clique_size),
+            )
+
+    def expand(self, candidates: int):
+        self.nodes_num += 1
+        self.sample_progress()
+        # only vertexes with color >= min_color can give a bigger clique
+        min_color = self.maximum_clique_size - len(self.current_clique) + 1
+        vertices, colors = self.color_sort(candidates, min_color)
+        for vertex, color in zip(reversed(vertices), reversed(colors)):
+            # colors bound the clique size of the remaining candidates
+            if len(self.current_clique) + color <= self.maximum_clique_size:
+                return
+            if self.is_limit_reached():
+                # the rest of vertexes have the same or smaller colors
+                self.skip_node(len(self.current_clique) + color)
+                return
+            if not self.current_clique:
+                self.root_color = color
+            self.current_clique.append(vertex)
+            new_candidates = candidates & self.adjacency[vertex]
+            if new_candidates:
+                self.branch_num += 1
+                self.expand(new_candidates)
+            elif len(self.current_clique) > self.maximum_clique_size:
+                self.update_best_solution()
+            self.current_clique.pop()
+            candidates &= ~(1 << vertex)
+
+    def search(self):
+        """Search only the cliques with vertexes fixed to 1 by the resumed nodes (see apply_edge_changes)"""
+        position = [0] * self.graph.vertices_num
+        for idx, vertex in enumerate(self.order):
+            position[vertex] = idx
+        for node in self.resumed_nodes:
+            self.current_clique = [
+                position[vertex]
+                for vertex, value in node.bound_changes
+                if value > 0.5
+            ]
+            candidates = self.graph.all_vertices_bits
+            for vertex in self.current_clique:
+                candidates &= self.adjacency[vertex] & ~(1 << vertex)
+            if self.is_limit_reached():
+                self.skip_node(len(self.current_clique) + popcount(candidates))
+            elif candidates:
+                self.branch_num += 1
+                self.expand(candidates)
+            elif len(self.current_clique) > self.maximum_clique_size:
+                self.update_best_solution()
+        self.current_clique = []
+        self.resumed_nodes = None
+
+    def branching(self):
+        self.expand(self.graph.all_vertices_bits)
@@ -0,0 +1,97 @@
+class ConstraintRegistry:
+    """Linear constraints added to the CPLEX model after its construction
+
+    Every added row gets a unique id. Rows are kept in the model order, so the index
+    of a row is the number of construction rows plus its position in the registry,
+    and rows are deleted by indices in one batch call.
+
+    Node local rows are tagged with the search tree depth they belong to and are
+    removed by backtrack(); global rows (depth is None) stay until removed explicitly.
+    """
+
+    def __init__(self, cplex_model):
+        self.cplex_model = cplex_model
+        self.base_rows_num = cplex_model.linear_constraints.get_num()
+        # row id -> depth (None for global rows) in the model rows order
+        self.rows = dict()
+        self.next_row_id = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, row_id):
+        return row_id in self.rows
+
+    def add_rows(self, lin_expr, senses, rhs, depth: int = None):
+        """Add rows to the model
+
+        Returns:
+        list: ids of the added rows
+
+        """
+        row_ids = list(
+            range(self.next_row_id, self.next_row_id + len(lin_expr)),
+        )
+        if not row_ids:
+            return row_ids
+        self.cplex_model.linear_constraints.add(
+            lin_expr=lin_expr,
+            senses=senses,
+            rhs=rhs,
+        )
+        self.next_row_id += len(row_ids)
+        for row_id in row_ids:
+            self.rows[row_id] = depth
+        return row_ids
+
+    def add(self, constraints, depth: int = None):
+        """Add sum(x_i for i in constraint) <= 1 rows"""
+        constraints = list(constraints)
+        return self.add_rows(
+            lin_expr=[
+                [list(constraint), [1.0] * len(constraint)]
+                for constraint in constraints
+            ],
+            senses=["L"] * len(constraints),
+            rhs=[1.0] * len(constraints),
+            depth=depth,
+        )
+
+    def indices(self, row_ids):
+        """Model indices of the added rows in the model order"""
+        row_ids = set(row_ids)
+        return [
+            self.base_rows_num + position
+            for position, row_id in enumerate(self.rows)
+            if row_id in row_ids
+        ]
+
+    def remove(self, row_ids):
+        row_ids = set(row_ids) & self.rows.keys()
+        if not row_ids:
+            return
+        self.cplex_model.linear_constraints.delete(self.indices(row_ids))
+        for row_id in row_ids:
+            del self.rows[row_id]
+
+    def remove_indices(self, indices):
+        """Remove rows by model indices, construction rows included (e.g. rows broken by graph changes)"""
+        indices = sorted(set(indices))
+        if not indices:
+            return
+        row_ids = list(self.rows)
+        self.cplex_model.linear_constraints.delete(indices)
+        for index in indices:
+            if index >= self.base_rows_num:
+                del self.rows[row_ids[index - self.base_rows_num]]
+        self.base_rows_num -= sum(
+            index < self.base_rows_num for index in indices
+        )
+
+    def backtrack(self, depth: int):
+        """Remove node local rows added deeper than depth"""
+        self.remove(
+            row_id
+            for row_id, row_depth in self.rows.items()
+            if row_depth is not None and row_depth > depth
+        )
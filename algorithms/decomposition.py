@@ -0,0 +1,168 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from algorithms import build_solver
+from coloring import coloring_bound, smallest_last_order
+from graph import MCPGraph
+from utils import *
+
+# graph, solver and shared incumbent size of the decomposition process pool worker
+_worker_graph = None
+_worker_solver_name = None
+_worker_solver_options = None
+_worker_incumbent = None
+
+
+def _init_decomposition_worker(graph, solver_name, solver_options, incumbent):
+    global _worker_graph, _worker_solver_name, _worker_solver_options, _worker_incumbent
+    _worker_graph = graph
+    _worker_solver_name = solver_name
+    _worker_solver_options = solver_options
+    _worker_incumbent = incumbent
+
+
+def _subproblem_job(vertex, later_neighbors):
+    return solve_subproblem(
+        _worker_graph,
+        vertex,
+        later_neighbors,
+        _worker_solver_name,
+        _worker_solver_options,
+        _worker_incumbent,
+    )
+
+
+def degeneracy_subproblems(graph: MCPGraph):
+    """(v, N+(v)) pairs, N+(v) - neighbours of v later in the degeneracy order
+
+    Every N+(v) has at most degeneracy vertexes. Pairs are given from the last vertex
+    of the degeneracy order, so the densest cores are solved first.
+    """
+    later_vertexes = 0
+    for vertex in smallest_last_order(graph.adjacency):
+        yield vertex, bits_to_array(graph.adjacency[vertex] & later_vertexes)
+        later_vertexes |= 1 << vertex
+
+
+def solve_subproblem(
+    graph: MCPGraph,
+    vertex: int,
+    later_neighbors: np.ndarray,
+    solver_name: str,
+    solver_options: dict,
+    incumbent,
+):
+    """Max clique of vertex and its later neighbours if it is bigger than the shared incumbent
+
+    Returns:
+    list: clique vertexes (ids of the original not reduced graph) or None
+
+    """
+    cutoff = incumbent.value
+    if len(later_neighbors) + 1 <= cutoff:
+        return None
+    if len(later_neighbors):
+        if (
+            1
+            + coloring_bound(
+                graph.adjacency,
+                array_to_bits(later_neighbors, graph.vertices_num),
+                limit=cutoff - 1,
+            )
+            <= cutoff
+        ):
+            return None
+        subgraph = graph.induced_subgraph(later_neighbors)
+        # cliques of subgraph are extended by vertex, the cutoff replaces the initial heuristic
+        # (many small subproblems would flood the constraints cache, so it is not used)
+        solver = build_solver(
+            subgraph,
+            solver_name,
+            use_cache=False,
+            initial_clique=[],
+            cutoff=max(cutoff - 1, 0),
+            **solver_options,
+        )
+        solver.solve()
+        clique = subgraph.to_original(
+            np.flatnonzero(np.isclose(solver.best_solution, 1.0, atol=1e-5)),
+        )
+    else:
+        clique = []
+    clique = graph.to_original([vertex]) + clique
+    with incumbent.get_lock():
+        if len(clique) <= incumbent.value:
+            return None
+        incumbent.value = len(clique)
+    return clique
+
+
+def decompose(
+    graph: MCPGraph,
+    solver_name: str = "MCS",
+    processes: int = 1,
+    initial_clique=(),
+    **solver_options,
+):
+    """Max clique by the degeneracy order decomposition
+
+    The maximum clique with v as its first vertex in the degeneracy order is v plus the
+    maximum clique of N+(v), so max clique is found by solving the small N+(v) subproblems.
+    With processes > 1 subproblems are spread across a process pool. The incumbent size is
+    shared between processes: subproblems which can not improve it are skipped and the
+    rest of them search only for bigger cliques.
+
+    Parameters:
+    graph (MCPGraph): graph (possibly reduced) to be decomposed
+    solver_name (str): solver of the subproblems
+    processes (int): number of processes
+    initial_clique (iterable): known clique vertexes of the graph
+    solver_options: subproblems solver parameters
+
+    Returns:
+    list: vertexes of the maximum clique (ids of the original not reduced graph)
+
+    """
+    start_time = time.time()
+    best_clique = graph.to_original(initial_clique)
+    incumbent = multiprocessing.Value("i", len(best_clique))
+    subproblems = [
+        (vertex, later_neighbors)
+        for vertex, later_neighbors in degeneracy_subproblems(graph)
+        if len(later_neighbors) + 1 > incumbent.value
+    ]
+    logger.info(
+        f"|{graph.name}| Decomposition: {len(subproblems)} subproblems of {graph.vertices_num} "
+        f"vertexes, the biggest has {max((len(neighbors) for _, neighbors in subproblems), default=0)} vertexes",
+    )
+
+    if processes > 1:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_decomposition_worker,
+            initargs=(graph, solver_name, solver_options, incumbent),
+        ) as executor:
+            futures = [
+                executor.submit(_subproblem_job, vertex, later_neighbors)
+                for vertex, later_neighbors in subproblems
+            ]
+            cliques = (future.result() for future in as_completed(futures))
+            for clique in cliques:
+                if clique is not None and len(clique) > len(best_clique):
+                    best_clique = clique
+    else:
+        for vertex, later_neighbors in subproblems:
+            clique = solve_subproblem(
+                graph,
+                vertex,
+                later_neighbors,
+                solver_name,
+                solver_options,
+                incumbent,
+            )
+            if clique is not None and len(clique) > len(best_clique):
+                best_clique = clique
+    logger.info(
+        f"|{graph.name}| Decomposition: clique size {len(best_clique)} in {time.time() - start_time:.3f} seconds",
+    )
+    return best_clique
@@ -0,0 +1,148 @@
+import random
+from collections import deque
+import numpy as np
+from coloring import coloring_bound
+from utils import *
+
+
+def greedy_clique(adjacency) -> int:
+    """Greedy clique from every vertex, the candidate with the biggest index is added first
+
+    Vertexes are expected to be numbered by increasing priority (e.g. degree), so the
+    best candidate is the highest bit of the candidates bitset.
+
+    Returns:
+    int: the biggest found clique bitset
+
+    """
+    best_clique, best_size = 0, 0
+    for vertex in range(len(adjacency)):
+        clique, size = 1 << vertex, 1
+        candidates = adjacency[vertex]
+        while candidates:
+            candidate = candidates.bit_length() - 1
+            clique |= 1 << candidate
+            size += 1
+            candidates &= adjacency[candidate]
+        if size > best_size:
+            best_clique, best_size = clique, size
+    return best_clique
+
+
+def clique_local_search(
+    adjacency,
+    clique: int,
+    time_limit: float,
+    upper_bound: int = None,
+    tabu_tenure: int = 7,
+    plateau_steps: int = 100,
+    seed: int = None,
+):
+    """Tabu plateau search for a bigger clique starting from the clique bitset
+
+    Every step adds a random vertex adjacent to the whole clique if there is one, else
+    swaps a clique vertex for a not tabu vertex adjacent to all clique vertexes but it
+    (the removed vertex is tabu for tabu_tenure swaps). When there are no moves or the
+    best clique is not improved for plateau_steps steps, the clique is perturbed by a
+    random vertex: only its neighbours are kept in the clique.
+    The search stops after time_limit seconds or when the clique reaches upper_bound.
+
+    Returns:
+    int: the best clique bitset
+    list: (seconds from the start, clique size) for every improvement of the best clique
+
+    """
+    rng = random.Random(seed)
+    all_vertices_bits = (1 << len(adjacency)) - 1
+    start_time = time.time()
+    best_clique, best_size = clique, popcount(clique)
+    history = [(0.0, best_size)]
+    tabu, tabu_bits = deque(), 0
+    steps_without_improvement = 0
+    while time.time() - start_time < time_limit:
+        if upper_bound is not None and best_size >= upper_bound:
+            break
+        # vertexes adjacent to all clique vertexes and to all of them but one
+        missing_none = all_vertices_bits & ~clique
+        missing_one = 0
+        for vertex in bits_to_vertices(clique):
+            neighbors = adjacency[vertex]
+            missing_one = (missing_one & neighbors) | (
+                missing_none & ~neighbors
+            )
+            missing_none &= neighbors
+
+        swaps = missing_one & ~tabu_bits
+        if missing_none:
+            clique |= 1 << rng.choice(bits_to_vertices(missing_none))
+        elif swaps and steps_without_improvement < plateau_steps:
+            vertex = rng.choice(bits_to_vertices(swaps))
+            removed = clique & ~adjacency[vertex]
+            clique ^= removed | (1 << vertex)
+            tabu.append(removed)
+            tabu_bits |= removed
+            if len(tabu) > tabu_tenure:
+                tabu_bits &= ~tabu.popleft()
+        else:
+            vertex = rng.randrange(len(adjacency))
+            clique = (clique & adjacency[vertex]) | (1 << vertex)
+            tabu, tabu_bits = deque(), 0
+            steps_without_improvement = 0
+
+        steps_without_improvement += 1
+        size = popcount(clique)
+        if size > best_size:
+            best_clique, best_size = clique, size
+            history.append((round(time.time() - start_time, 3), size))
+            steps_without_improvement = 0
+    return best_clique, history
+
+
+def heuristic_clique(graph, time_limit: float = 1.0, seed: int = None):
+    """Greedy clique from every vertex improved by the local search for time_limit seconds
+
+    Returns:
+    set: vertexes of the best found clique
+    list: (seconds from the local search start, clique size) for every improvement
+
+    """
+    # renumbered by increasing degree: the last candidate has the max degree
+    order = np.argsort(graph.degrees, kind="stable")
+    adjacency = graph.permuted_adjacency(order)
+    clique = greedy_clique(adjacency)
+    logger.info(f"Initial heuristic: greedy clique size {popcount(clique)}")
+    history = [(0.0, popcount(clique))]
+    if time_limit > 0:
+        clique, history = clique_local_search(
+            adjacency,
+            clique,
+            time_limit,
+            upper_bound=coloring_bound(adjacency, graph.all_vertices_bits),
+            seed=seed,
+        )
+        for work_time, clique_size in history[1:]:
+            logger.info(
+                f"Initial heuristic: local search clique size {clique_size} after {work_time} seconds",
+            )
+    return {int(order[vertex]) for vertex in bits_to_vertices(clique)}, history
+
+
+def rounding_clique(adjacency, values, degrees) -> int:
+    """Clique from the LP solution: greedy by decreasing LP value (ties by degree)
+
+    Vertexes are added while they are adjacent to the whole clique, so the clique
+    of the biggest LP values is completed by the max degree vertexes.
+
+    Returns:
+    int: the clique bitset
+
+    """
+    clique = 0
+    candidates = (1 << len(adjacency)) - 1
+    for vertex in np.lexsort((degrees, values))[::-1].tolist():
+        if not candidates:
+            break
+        if candidates >> vertex & 1:
+            clique |= 1 << vertex
+            candidates &= adjacency[vertex]
+    return clique
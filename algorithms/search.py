@@ -0,0 +1,68 @@
+import heapq
+from collections import namedtuple
+
+# bound_changes - ((variable index, fixed value), ...) from the root to the node
+# lp_bound - LP objective value of the parent node (upper bound of the node)
+SearchNode = namedtuple("SearchNode", ["bound_changes", "lp_bound", "depth"])
+
+NODE_SELECTION_STRATEGIES = ["depth_first", "best_first", "hybrid"]
+
+
+class NodeQueue:
+    """Open nodes of the search tree
+
+    Node selection strategies:
+        depth_first - the last pushed node first
+        best_first - the node with the biggest LP bound first (deeper one on ties)
+        hybrid - dive into the first child of the last branched node while the dive
+                 goes on, then continue from the node with the best LP bound
+    """
+
+    def __init__(self, node_selection: str = "best_first"):
+        if node_selection not in NODE_SELECTION_STRATEGIES:
+            raise ValueError(
+                f"Unknown node selection strategy: {node_selection}",
+            )
+        self.node_selection = node_selection
+        self.stack = []
+        self.heap = []
+        self.dive_node = None
+        self.pushed_num = 0
+
+    def __len__(self):
+        return len(self.stack) + len(self.heap) + (self.dive_node is not None)
+
+    def nodes(self):
+        dive_node = [] if self.dive_node is None else [self.dive_node]
+        return self.stack + [entry[-1] for entry in self.heap] + dive_node
+
+    def _push_heap(self, node: SearchNode):
+        heapq.heappush(
+            self.heap,
+            (-node.lp_bound, -node.depth, self.pushed_num, node),
+        )
+        self.pushed_num += 1
+
+    def push(self, children):
+        """Push children of one node, the preferred child first"""
+        if self.node_selection == "depth_first":
+            self.stack.extend(reversed(children))
+            return
+        if self.node_selection == "hybrid" and children:
+            if self.dive_node is not None:
+                self._push_heap(self.dive_node)
+            self.dive_node, children = children[0], children[1:]
+        for node in children:
+            self._push_heap(node)
+
+    def pop(self) -> SearchNode:
+        if self.node_selection == "depth_first":
+            return self.stack.pop()
+        if self.dive_node is not None:
+            node, self.dive_node = self.dive_node, None
+            return node
+        return heapq.heappop(self.heap)[-1]
+
+    def best_bound(self):
+        """The biggest LP bound of open nodes (None if there are no open nodes)"""
+        return max((node.lp_bound for node in self.nodes()), default=None)
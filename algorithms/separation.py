@@ -0,0 +1,210 @@
+import heapq
+import numpy as np
+from algorithms.constraints import ConstraintRegistry
+from utils import *
+
+
+def separate_clique_inequalities(
+    adjacency,
+    solution,
+    max_seeds: int = 20,
+    eps: float = EPS,
+):
+    """Heuristic separation of clique inequalities (sum of x over independent set <= 1)
+
+    Each fractional vertex (by decreasing LP value, at most max_seeds of them) seeds an
+    independent set which is greedily extended by not adjacent vertexes with the biggest
+    LP value. Violated sets are lifted to maximal independent sets by zero valued vertexes.
+
+    Returns:
+    list: (independent set vertexes tuple, violation) sorted by decreasing violation
+
+    """
+    vertices_num = len(adjacency)
+    all_vertices_bits = (1 << vertices_num) - 1
+    positive = [
+        vertex for vertex in range(vertices_num) if solution[vertex] > eps
+    ]
+    positive.sort(key=lambda vertex: solution[vertex], reverse=True)
+    positive_bits = vertices_to_bits(positive)
+    seeds = [vertex for vertex in positive if solution[vertex] < 1 - eps]
+
+    violated_sets = dict()
+    for seed in seeds[:max_seeds]:
+        independent_set = 1 << seed
+        weight = solution[seed]
+        candidates = positive_bits & ~adjacency[seed] & ~independent_set
+        for vertex in positive:
+            if not candidates:
+                break
+            if candidates >> vertex & 1:
+                independent_set |= 1 << vertex
+                weight += solution[vertex]
+                candidates &= ~adjacency[vertex] & ~(1 << vertex)
+        if weight <= 1 + eps:
+            continue
+
+        # lifting: vertexes not adjacent to the whole set make the cut stronger
+        free_vertices = all_vertices_bits & ~independent_set
+        for vertex in bits_to_vertices(independent_set):
+            free_vertices &= ~adjacency[vertex]
+        while free_vertices:
+            lowest_bit = free_vertices & -free_vertices
+            independent_set |= lowest_bit
+            free_vertices &= ~adjacency[lowest_bit.bit_length() - 1]
+            free_vertices ^= lowest_bit
+
+        violated_sets[tuple(bits_to_vertices(independent_set))] = weight - 1
+    return sorted(
+        violated_sets.items(),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+
+class CutPool:
+    """Clique inequalities found by separation together with their statistics
+
+    Cuts are deduplicated by their vertexes and added to the model through the
+    constraint registry. A cut in the model which is not tight for more than max_age
+    LP solves in a row is removed from the model but stays in the pool: next
+    separation rounds add it back if it is violated again. Node local cuts are
+    also removed from the model by the registry on backtrack. When the pool grows
+    over max_size, cuts out of the model which were not tight for the longest time
+    are removed from the pool.
+    """
+
+    def __init__(
+        self,
+        constraint_registry: ConstraintRegistry,
+        max_age: int = 10,
+        max_size: int = 1000,
+        eps: float = EPS,
+    ):
+        self.constraint_registry = constraint_registry
+        self.max_age = max_age
+        self.max_size = max_size
+        self.eps = eps
+        # vertexes tuple -> cut statistics
+        self.cuts = dict()
+        # vertexes of cuts added to the model, node local ones are
+        # discarded by the next update_ages after backtrack removes their rows
+        self.model_cuts = set()
+        # number of update_ages calls, cut last_active is measured in them
+        self.solves_num = 0
+        self.added_num = 0
+        self.evicted_num = 0
+        self.discarded_num = 0
+
+    def is_in_model(self, vertexes) -> bool:
+        return (
+            vertexes in self.model_cuts
+            and self.cuts[vertexes]["row_id"] in self.constraint_registry
+        )
+
+    def violated_inactive_cuts(self, solution):
+        """Pool cuts which are not in the model and violated by the solution"""
+        violated = []
+        for vertexes in self.cuts:
+            if self.is_in_model(vertexes):
+                continue
+            violation = float(np.sum(np.take(solution, vertexes))) - 1
+            if violation > self.eps:
+                violated.append((vertexes, violation))
+        return violated
+
+    def get_cut(self, vertexes):
+        """Statistics of the cut, a new cut is added to the pool (but not to the model)"""
+        return self.cuts.setdefault(
+            vertexes,
+            {
+                "row_id": None,
+                "age": 0,
+                "times_added": 0,
+                "max_violation": 0.0,
+                "last_active": self.solves_num,
+            },
+        )
+
+    def add(self, violated_cuts, depth: int = None):
+        """Add violated cuts to the model (cuts which are in the model already are skipped)
+
+        Returns:
+        list: vertexes tuples of cuts added to the model
+
+        """
+        new_cuts = []
+        for vertexes, violation in violated_cuts:
+            cut = self.get_cut(vertexes)
+            cut["max_violation"] = max(cut["max_violation"], violation)
+            cut["last_active"] = self.solves_num
+            if self.is_in_model(vertexes) or vertexes in new_cuts:
+                continue
+            cut["age"] = 0
+            cut["times_added"] += 1
+            new_cuts.append(vertexes)
+
+        row_ids = self.constraint_registry.add(new_cuts, depth)
+        for vertexes, row_id in zip(new_cuts, row_ids):
+            self.cuts[vertexes]["row_id"] = row_id
+        self.model_cuts.update(new_cuts)
+        self.added_num += len(new_cuts)
+        self.shrink()
+        return new_cuts
+
+    def remove(self, cuts):
+        """Remove cuts from the pool and their rows from the model"""
+        row_ids = []
+        for vertexes in cuts:
+            row_ids.append(self.cuts.pop(vertexes)["row_id"])
+            self.model_cuts.discard(vertexes)
+        self.constraint_registry.remove(row_ids)
+
+    def shrink(self):
+        """Remove cuts out of the model which were not tight for the longest time over max_size"""
+        excess = len(self.cuts) - self.max_size
+        if excess <= 0:
+            return
+        inactive_cuts = [
+            vertexes
+            for vertexes in self.cuts
+            if not self.is_in_model(vertexes)
+        ]
+        self.remove(
+            heapq.nsmallest(
+                excess,
+                inactive_cuts,
+                key=lambda vertexes: self.cuts[vertexes]["last_active"],
+            ),
+        )
+        self.discarded_num += min(excess, len(inactive_cuts))
+
+    def update_ages(self, solution):
+        """Age not tight model cuts and remove the ones older than max_age from the model"""
+        self.solves_num += 1
+        expired = []
+        for vertexes in list(self.model_cuts):
+            cut = self.cuts[vertexes]
+            if cut["row_id"] not in self.constraint_registry:
+                self.model_cuts.discard(vertexes)
+                continue
+            slack = 1 - float(np.sum(np.take(solution, vertexes)))
+            if slack > self.eps:
+                cut["age"] += 1
+            else:
+                cut["age"] = 0
+                cut["last_active"] = self.solves_num
+            if cut["age"] > self.max_age:
+                expired.append(cut["row_id"])
+                self.model_cuts.discard(vertexes)
+        self.constraint_registry.remove(expired)
+        self.evicted_num += len(expired)
+
+    def statistics(self):
+        return {
+            "pool_size": len(self.cuts),
+            "in_model": sum(map(self.is_in_model, self.model_cuts)),
+            "added": self.added_num,
+            "evicted": self.evicted_num,
+            "discarded": self.discarded_num,
+        }
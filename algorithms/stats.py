@@ -0,0 +1,98 @@
+import functools
+import time
+
+
+class PhaseTimer:
+    """Context manager which adds the time of its block to the phase time"""
+
+    __slots__ = ("times", "phase", "start_time")
+
+    def __init__(self, times: dict, phase: str):
+        self.times = times
+        self.phase = phase
+        self.start_time = 0.0
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.times[self.phase] = (
+            self.times.get(self.phase, 0.0)
+            + time.perf_counter()
+            - self.start_time
+        )
+        return False
+
+
+class SolverStats:
+    """Per phase times, event counters and time samples of the incumbent and the bound
+
+    Timers are reused per phase, so timing a hot path costs two perf_counter calls.
+    A phase should not be nested into itself. Samples (seconds from the start, nodes,
+    incumbent, bound) are taken at most every sample_interval seconds (None - never).
+    """
+
+    def __init__(self, sample_interval: float = None):
+        self.times = dict()
+        self.counters = dict()
+        self.samples = []
+        self.sample_interval = sample_interval
+        self.start_time = time.perf_counter()
+        self.last_sample_time = None
+        self._timers = dict()
+
+    def timer(self, phase: str) -> PhaseTimer:
+        timer = self._timers.get(phase)
+        if timer is None:
+            timer = self._timers[phase] = PhaseTimer(self.times, phase)
+        return timer
+
+    def add_time(self, phase: str, seconds: float):
+        self.times[phase] = self.times.get(phase, 0.0) + seconds
+
+    def count(self, counter: str, value: int = 1):
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def is_sample_due(self) -> bool:
+        return self.sample_interval is not None and (
+            self.last_sample_time is None
+            or time.perf_counter() - self.last_sample_time
+            >= self.sample_interval
+        )
+
+    def sample(self, nodes_num: int, incumbent: int, bound: float):
+        self.last_sample_time = time.perf_counter()
+        self.samples.append(
+            (
+                round(self.last_sample_time - self.start_time, 3),
+                nodes_num,
+                incumbent,
+                round(bound, 3),
+            ),
+        )
+
+    def to_dict(self) -> dict:
+        """JSON serializable statistics"""
+        return {
+            "times": {
+                phase: round(seconds, 3)
+                for phase, seconds in sorted(self.times.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "samples": [list(sample) for sample in self.samples],
+        }
+
+
+def timed(phase: str):
+    """Method decorator: the method time is added to self.stats phase (the result is not changed)"""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrap(self, *args, **kwargs):
+            with self.stats.timer(phase):
+                return method(self, *args, **kwargs)
+
+        return wrap
+
+    return decorator
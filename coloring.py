@@ -0,0 +1,207 @@
+import random
+from collections import deque
+import numpy as np
+from utils import *
+
+
+def greedy_coloring(adjacency, order):
+    """First fit coloring of vertexes in the given order
+
+    Parameters:
+    adjacency (list): per vertex neighbours bitsets
+    order (iterable): vertexes coloring order
+
+    Returns:
+    list: color classes as vertexes bitsets
+
+    """
+    color_classes = []
+    for vertex in order:
+        neighbors = adjacency[vertex]
+        for color, color_class in enumerate(color_classes):
+            if not color_class & neighbors:
+                color_classes[color] = color_class | (1 << vertex)
+                break
+        else:
+            color_classes.append(1 << vertex)
+    return color_classes
+
+
+def coloring_bound(adjacency, candidates: int, limit: int = None) -> int:
+    """Number of colors of the candidates subgraph greedy coloring (upper bound of its max clique)
+
+    Colors are built one by one as maximal independent sets in the vertexes index order.
+    Counting stops as soon as the number of colors exceeds limit.
+    """
+    colors_num = 0
+    uncolored = candidates
+    while uncolored:
+        colors_num += 1
+        if limit is not None and colors_num > limit:
+            break
+        available = uncolored
+        while available:
+            lowest_bit = available & -available
+            uncolored ^= lowest_bit
+            available &= ~adjacency[lowest_bit.bit_length() - 1]
+            available &= ~lowest_bit
+    return colors_num
+
+
+def largest_first_order(adjacency, rng, weights=None):
+    degrees = [popcount(bits) for bits in adjacency]
+    return sorted(
+        range(len(adjacency)),
+        key=degrees.__getitem__,
+        reverse=True,
+    )
+
+
+def random_sequential_order(adjacency, rng, weights=None):
+    order = list(range(len(adjacency)))
+    rng.shuffle(order)
+    return order
+
+
+def smallest_last_order(adjacency, rng=None, weights=None):
+    """Degeneracy order: min degree vertex of the remaining graph is removed and placed last"""
+    vertices_num = len(adjacency)
+    degrees = np.array([popcount(bits) for bits in adjacency], dtype=float)
+    remaining = (1 << vertices_num) - 1
+    order = []
+    for _ in range(vertices_num):
+        vertex = int(np.argmin(degrees))
+        order.append(vertex)
+        degrees[vertex] = np.inf
+        remaining ^= 1 << vertex
+        degrees[bits_to_array(adjacency[vertex] & remaining)] -= 1
+    order.reverse()
+    return order
+
+
+def connected_sequential_order(adjacency, rng=None, traversal="bfs"):
+    """Vertexes in breadth-first or depth-first traversal order, component by component"""
+    unvisited = (1 << len(adjacency)) - 1
+    order = []
+    while unvisited:
+        source = (unvisited & -unvisited).bit_length() - 1
+        unvisited ^= 1 << source
+        order.append(source)
+        if traversal == "bfs":
+            queue = deque([source])
+            while queue:
+                new_vertexes = adjacency[queue.popleft()] & unvisited
+                unvisited ^= new_vertexes
+                new_vertexes = bits_to_vertices(new_vertexes)
+                order.extend(new_vertexes)
+                queue.extend(new_vertexes)
+        else:
+            stack = [source]
+            while stack:
+                not_visited_neighbors = adjacency[stack[-1]] & unvisited
+                if not not_visited_neighbors:
+                    stack.pop()
+                    continue
+                vertex = (
+                    not_visited_neighbors & -not_visited_neighbors
+                ).bit_length() - 1
+                unvisited ^= 1 << vertex
+                order.append(vertex)
+                stack.append(vertex)
+    return order
+
+
+def weighted_order(adjacency, rng, weights):
+    """Vertexes by decreasing weight (e.g. LP solution value), ties by degree"""
+    degrees = [popcount(bits) for bits in adjacency]
+    return sorted(
+        range(len(adjacency)),
+        key=lambda vertex: (weights[vertex], degrees[vertex]),
+        reverse=True,
+    )
+
+
+def saturation_largest_first_coloring(adjacency, rng=None, weights=None):
+    """DSATUR: next vertex is the one with the most distinct neighbour colors, ties by degree"""
+    vertices_num = len(adjacency)
+    degrees = np.array([popcount(bits) for bits in adjacency], dtype=float)
+    # priority = saturation * (n + 1) + degree, colored vertexes are -inf
+    priority = degrees.copy()
+    neighbor_colors = [0] * vertices_num
+    uncolored = (1 << vertices_num) - 1
+    color_classes = []
+    for _ in range(vertices_num):
+        vertex = int(np.argmax(priority))
+        priority[vertex] = -np.inf
+        uncolored ^= 1 << vertex
+        used_colors = neighbor_colors[vertex]
+        # the smallest color not used by neighbours
+        color = (~used_colors & (used_colors + 1)).bit_length() - 1
+        if color == len(color_classes):
+            color_classes.append(0)
+        color_classes[color] |= 1 << vertex
+        color_bit = 1 << color
+        for neighbor in bits_to_vertices(adjacency[vertex] & uncolored):
+            if not neighbor_colors[neighbor] & color_bit:
+                neighbor_colors[neighbor] |= color_bit
+                priority[neighbor] += vertices_num + 1
+    return color_classes
+
+
+def independent_set_coloring(adjacency, rng=None, weights=None):
+    """Each color class is a maximal independent set of uncolored vertexes built greedily by min degree"""
+    uncolored = (1 << len(adjacency)) - 1
+    color_classes = []
+    while uncolored:
+        candidates = uncolored
+        independent_set = 0
+        while candidates:
+            vertex = min(
+                bits_to_vertices(candidates),
+                key=lambda vertex: popcount(adjacency[vertex] & candidates),
+            )
+            independent_set |= 1 << vertex
+            candidates &= ~adjacency[vertex] & ~(1 << vertex)
+        color_classes.append(independent_set)
+        uncolored &= ~independent_set
+    return color_classes
+
+
+# strategies which give the order for greedy_coloring
+ORDER_STRATEGIES = {
+    "largest_first": largest_first_order,
+    "random_sequential": random_sequential_order,
+    "smallest_last": smallest_last_order,
+    "connected_sequential_bfs": lambda adjacency, rng, weights: (
+        connected_sequential_order(adjacency, rng, "bfs")
+    ),
+    "connected_sequential_dfs": lambda adjacency, rng, weights: (
+        connected_sequential_order(adjacency, rng, "dfs")
+    ),
+    "weighted": weighted_order,
+}
+# strategies which choose the next vertex depending on the current coloring
+COLORING_STRATEGIES = {
+    "saturation_largest_first": saturation_largest_first_coloring,
+    "independent_set": independent_set_coloring,
+}
+
+
+def color_classes(adjacency, strategy: str, seed=None, weights=None):
+    """Greedy coloring of the graph given by adjacency bitsets
+
+    Parameters:
+    adjacency (list): per vertex neighbours bitsets
+    strategy (str): one of ORDER_STRATEGIES or COLORING_STRATEGIES names
+    seed (int): seed of random_sequential strategy
+    weights (list): vertexes weights for weighted strategy
+
+    Returns:
+    list: color classes as vertexes bitsets
+
+    """
+    rng = random.Random(seed)
+    if strategy in COLORING_STRATEGIES:
+        return COLORING_STRATEGIES[strategy](adjacency, rng, weights)
+    order = ORDER_STRATEGIES[strategy](adjacency, rng, weights)
+    return greedy_coloring(adjacency, order)
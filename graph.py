@@ -1,16 +1,34 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+import json
+import zipfile
 from typing import Union
 import numpy as np
 from utils import *
+from coloring import color_classes
 from math import inf
 
+# adjacency of the independent sets generation process pool worker
+_worker_adjacency = None
+
+
+def _init_coloring_worker(adjacency):
+    global _worker_adjacency
+    _worker_adjacency = adjacency
+
+
+def _coloring_job(strategy, seed, weights, deadline):
+    if time.time() >= deadline:
+        return None
+    return color_classes(_worker_adjacency, strategy, seed, weights)
+
 
 class MCPGraph:
     def __init__(self, data: Union[str, np.ndarray, namedtuple]):
         if isinstance(data, tuple):
-            adj_matrix = self.read_and_prepare_data(
+            vertices_num, edges = self.read_and_prepare_data(
                 osp.join(SOURCE_GRAPH_DIR, data.GraphName),
             )
-            self.graph = nx.from_numpy_array(adj_matrix)
             # the graph name without extension
             self.name = data.GraphName[:-4]
             # right answer for MCP
@@ -18,14 +36,13 @@ class MCPGraph:
             self.complexity_type = data.Level
 
         elif isinstance(data, str):
-            adj_matrix = self.read_and_prepare_data(data)
-            self.graph = nx.from_numpy_array(adj_matrix)
+            vertices_num, edges = self.read_and_prepare_data(data)
             self.name = osp.basename(data)[:-4]
             self.maximum_clique_size_gt = None
             self.complexity_type = None
 
         elif isinstance(data, np.ndarray):
-            self.graph = nx.from_numpy_array(data)
+            vertices_num, edges = len(data), self.edges_from_matrix(data)
             self.name = None
             self.maximum_clique_size_gt = None
             self.complexity_type = None
@@ -35,11 +52,400 @@ class MCPGraph:
                 f"\n Wrong input data format: {type(data)}\n "
                 f"Should be <str> - (path to data)  or <np.ndarray> (adjacency matrix) or NamedTuple",
             )
+        self.set_edges(vertices_num, edges)
+
+    @classmethod
+    def from_edges(cls, vertices_num: int, edges, name: str = None):
+        """Graph of the edge list ((u, v) pairs of 0-based vertexes, self loops are dropped)"""
+        graph = cls.__new__(cls)
+        graph.name = name
+        graph.maximum_clique_size_gt = None
+        graph.complexity_type = None
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        graph.set_edges(vertices_num, edges[edges[:, 0] != edges[:, 1]])
+        return graph
+
+    def set_edges(self, vertices_num: int, edges: np.ndarray):
+        # networkx graph is built only on demand (see graph)
+        self._nx_graph = None
+        # adjacency[v] - bitset of v neighbours (bit u is set if (v, u) is an edge)
+        self.adjacency = self.adjacency_bitsets(vertices_num, edges)
+        self.vertices_num = len(self.adjacency)
+        self.all_vertices_bits = (1 << self.vertices_num) - 1
+        self.degrees = [popcount(bits) for bits in self.adjacency]
         self.maximum_clique_size_found = -1
         self.independent_vertex_sets = set()
-        self.not_connected_vertexes = nx.complement(self.graph).edges
-        self.nodes = self.graph.nodes
+        # phase -> seconds of the constraints preparation (see prepare_constraints)
+        self.preparation_times = dict()
+        # complement edges are generated only on demand (see not_connected_vertexes)
+        self._not_connected_vertexes = None
         self.is_solution_is_clique = None
+        # original_vertexes[v] - id of v in the graph this one was reduced from (None - not reduced)
+        self.original_vertexes = None
+
+    def apply_edge_changes(self, added_edges=(), removed_edges=()):
+        """Insert and delete edges in place (vertexes number is not changed)
+
+        Independent sets broken by inserted edges are replaced by their independent
+        subsets (see independent_subsets). Complement edges and the networkx graph
+        are generated again at the next access.
+
+        Parameters:
+        added_edges (iterable): (u, v) pairs of inserted edges
+        removed_edges (iterable): (u, v) pairs of deleted edges
+
+        Returns:
+        np.ndarray: inserted edges (u, v), u < v which were not in the graph
+        np.ndarray: deleted edges (u, v), u < v which were in the graph
+
+        """
+        changes = []
+        for edges, is_added in ((added_edges, True), (removed_edges, False)):
+            edges = np.sort(
+                np.asarray(edges, dtype=np.int64).reshape(-1, 2),
+                axis=1,
+            )
+            edges = np.unique(edges[edges[:, 0] != edges[:, 1]], axis=0)
+            if len(edges) and (
+                edges.min() < 0 or edges.max() >= self.vertices_num
+            ):
+                raise ValueError(
+                    f"Edge vertexes should be in [0, {self.vertices_num})",
+                )
+            is_edge = np.array(
+                [self.adjacency[u] >> v & 1 for u, v in edges.tolist()],
+                dtype=bool,
+            )
+            # only edges which change the graph
+            edges = edges[is_edge != is_added]
+            for u, v in edges.tolist():
+                self.adjacency[u] ^= 1 << v
+                self.adjacency[v] ^= 1 << u
+                self.degrees[u] += 1 if is_added else -1
+                self.degrees[v] += 1 if is_added else -1
+            changes.append(edges)
+        added_edges, removed_edges = changes
+
+        if len(added_edges) and self.independent_vertex_sets:
+            edges_bits = [(1 << u) | (1 << v) for u, v in added_edges.tolist()]
+            broken_sets = [
+                ind_set
+                for ind_set in self.independent_vertex_sets
+                if any(
+                    vertices_to_bits(ind_set) & bits == bits
+                    for bits in edges_bits
+                )
+            ]
+            for ind_set in broken_sets:
+                self.independent_vertex_sets.remove(ind_set)
+                self.independent_vertex_sets.update(
+                    self.independent_subsets(ind_set, added_edges.tolist()),
+                )
+        if len(added_edges) or len(removed_edges):
+            self._nx_graph = None
+            self._not_connected_vertexes = None
+        return added_edges, removed_edges
+
+    @staticmethod
+    def independent_subsets(vertexes, edges):
+        """Maximal subsets of vertexes without edges inside, every other pair of vertexes stays in some subset
+
+        Every edge (u, v) splits each subset with both its ends into the subset
+        without u and the subset without v. Subsets of one vertex are dropped.
+
+        Parameters:
+        vertexes (tuple): vertexes of an independent set of the graph before the edges were inserted
+        edges (list): (u, v) pairs of inserted edges
+
+        Returns:
+        list: vertexes tuples of the subsets
+
+        """
+        subsets = {tuple(vertexes)}
+        for u, v in edges:
+            split_subsets = set()
+            for subset in subsets:
+                if u in subset and v in subset:
+                    split_subsets.add(tuple(x for x in subset if x != u))
+                    split_subsets.add(tuple(x for x in subset if x != v))
+                else:
+                    split_subsets.add(subset)
+            subsets = split_subsets
+        maximal_subsets = []
+        for subset in sorted(subsets, key=len, reverse=True):
+            if len(subset) > 1 and not any(
+                set(subset) <= set(other) for other in maximal_subsets
+            ):
+                maximal_subsets.append(subset)
+        return maximal_subsets
+
+    @property
+    def graph(self):
+        """networkx graph of the adjacency, built at the first access (solvers work on bitsets)"""
+        if self._nx_graph is None:
+            self._nx_graph = nx.Graph()
+            self._nx_graph.add_nodes_from(range(self.vertices_num))
+            for vertex, bits in enumerate(self.adjacency):
+                later_neighbors = bits_to_array(bits >> (vertex + 1))
+                self._nx_graph.add_edges_from(
+                    (vertex, neighbor)
+                    for neighbor in (later_neighbors + vertex + 1).tolist()
+                )
+        return self._nx_graph
+
+    @property
+    def nodes(self):
+        return self.graph.nodes
+
+    @staticmethod
+    def edges_from_matrix(adj_matrix: np.ndarray):
+        """Edge list (u < v) of the adjacency matrix
+
+        Matrix may be filled only in the upper triangle, so it is symmetrized first.
+        """
+        adj_matrix = np.asarray(adj_matrix, dtype=bool)
+        upper_triangle = np.triu(adj_matrix | adj_matrix.T, k=1)
+        return np.argwhere(upper_triangle)
+
+    @staticmethod
+    def adjacency_bitsets(
+        vertices_num: int,
+        edges: np.ndarray,
+        block_size: int = 1024,
+    ):
+        """Convert edge list to the list of per vertex neighbours bitsets
+
+        Rows are packed by blocks of block_size vertexes, so the dense
+        adjacency matrix is never allocated as a whole.
+        """
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        sources = np.concatenate([edges[:, 0], edges[:, 1]])
+        targets = np.concatenate([edges[:, 1], edges[:, 0]])
+        order = np.argsort(sources, kind="stable")
+        sources, targets = sources[order], targets[order]
+
+        adjacency = []
+        for block_start in range(0, vertices_num, block_size):
+            block_end = min(block_start + block_size, vertices_num)
+            begin, end = np.searchsorted(sources, [block_start, block_end])
+            block = np.zeros((block_end - block_start, vertices_num), bool)
+            block[sources[begin:end] - block_start, targets[begin:end]] = True
+            packed_rows = np.packbits(block, axis=1, bitorder="little")
+            adjacency.extend(
+                int.from_bytes(row.tobytes(), "little") for row in packed_rows
+            )
+        return adjacency
+
+    def common_neighbors(self, nodelist) -> int:
+        """Bitset of vertexes connected with every vertex from nodelist"""
+        common = self.all_vertices_bits
+        for vertex in nodelist:
+            common &= self.adjacency[vertex]
+        return common
+
+    def is_clique(self, nodelist) -> bool:
+        nodes_bits = vertices_to_bits(nodelist)
+        for vertex in nodelist:
+            if nodes_bits & ~self.adjacency[vertex] & ~(1 << vertex):
+                return False
+        return True
+
+    def permuted_adjacency(self, order):
+        """Adjacency bitsets of the graph where vertex order[i] is renumbered to i"""
+        position = np.empty(self.vertices_num, dtype=np.int64)
+        position[np.asarray(order, dtype=np.int64)] = np.arange(
+            self.vertices_num,
+        )
+        return [
+            array_to_bits(
+                position[bits_to_array(self.adjacency[vertex])],
+                self.vertices_num,
+            )
+            for vertex in order
+        ]
+
+    def reducible_vertexes(
+        self,
+        clique_size: int,
+        removed: int = 0,
+        keep: int = 0,
+    ) -> int:
+        """Vertexes which can be removed keeping a clique of clique_size or bigger if it exists
+
+        k-core peeling removes vertexes with less than clique_size - 1 neighbours. A vertex
+        is dominated if a not adjacent vertex is connected with all its neighbours: it can
+        replace the vertex in any clique. Vertexes of keep bitset are not removed by domination.
+
+        Parameters:
+        clique_size (int): size of the cliques which should be kept
+        removed (int): bitset of already removed vertexes
+        keep (int): bitset of vertexes which should not be removed by domination
+
+        Returns:
+        int: bitset of removable vertexes (not including already removed ones)
+
+        """
+        remaining = self.all_vertices_bits & ~removed
+        is_changed = True
+        while is_changed:
+            is_changed = False
+            degrees = [
+                popcount(self.adjacency[vertex] & remaining)
+                for vertex in range(self.vertices_num)
+            ]
+            peeled = [
+                vertex
+                for vertex in bits_to_vertices(remaining)
+                if degrees[vertex] < clique_size - 1
+            ]
+            while peeled:
+                vertex = peeled.pop()
+                if not remaining >> vertex & 1:
+                    continue
+                remaining ^= 1 << vertex
+                for neighbor in bits_to_vertices(
+                    self.adjacency[vertex] & remaining,
+                ):
+                    degrees[neighbor] -= 1
+                    if degrees[neighbor] < clique_size - 1:
+                        peeled.append(neighbor)
+
+            for vertex in bits_to_vertices(remaining & ~keep):
+                neighbors = self.adjacency[vertex] & remaining
+                dominating = remaining & ~neighbors & ~(1 << vertex)
+                for neighbor in bits_to_vertices(neighbors):
+                    if not dominating:
+                        break
+                    dominating &= self.adjacency[neighbor]
+                if dominating:
+                    remaining ^= 1 << vertex
+                    is_changed = True
+        return self.all_vertices_bits & ~removed & ~remaining
+
+    def induced_subgraph(self, vertexes: np.ndarray):
+        """Subgraph induced by sorted vertexes, its original_vertexes map it back to the original graph"""
+        vertexes = np.asarray(vertexes, dtype=np.int64)
+        position = np.full(self.vertices_num, -1, dtype=np.int64)
+        position[vertexes] = np.arange(len(vertexes))
+        vertexes_bits = array_to_bits(vertexes, self.vertices_num)
+        sources, targets = [np.empty(0, np.int64)], [np.empty(0, np.int64)]
+        for idx, vertex in enumerate(vertexes.tolist()):
+            # every edge once: to the subgraph neighbours with bigger ids
+            neighbours = position[
+                bits_to_array(
+                    self.adjacency[vertex]
+                    & vertexes_bits
+                    & ~((2 << vertex) - 1),
+                )
+            ]
+            sources.append(np.full(len(neighbours), idx))
+            targets.append(neighbours)
+        subgraph = MCPGraph.from_edges(
+            len(vertexes),
+            np.column_stack(
+                [np.concatenate(sources), np.concatenate(targets)]
+            ),
+        )
+        subgraph.name = self.name
+        subgraph.maximum_clique_size_gt = self.maximum_clique_size_gt
+        subgraph.complexity_type = self.complexity_type
+        subgraph.original_vertexes = (
+            vertexes
+            if self.original_vertexes is None
+            else self.original_vertexes[vertexes]
+        )
+        return subgraph
+
+    def reduce(self, clique_size: int, keep=()):
+        """Preprocessing: subgraph without vertexes removable by reducible_vertexes
+
+        Parameters:
+        clique_size (int): size of the cliques which should be kept (e.g. incumbent size)
+        keep (iterable): vertexes which should stay in the subgraph (e.g. incumbent clique)
+
+        Returns:
+        MCPGraph: reduced graph with original_vertexes mapping
+
+        """
+        start_time = time.time()
+        removed = self.reducible_vertexes(
+            clique_size,
+            keep=vertices_to_bits(keep),
+        )
+        reduced_graph = self.induced_subgraph(
+            bits_to_array(self.all_vertices_bits & ~removed),
+        )
+        edges_num = sum(self.degrees) // 2
+        logger.info(
+            f"|{self.name}| Preprocessing: removed {popcount(removed)} of {self.vertices_num} vertexes "
+            f"and {edges_num - sum(reduced_graph.degrees) // 2} of {edges_num} edges "
+            f"in {time.time() - start_time:.3f} seconds",
+        )
+        return reduced_graph
+
+    def to_original(self, vertexes):
+        """Vertexes ids in the graph this one was reduced from"""
+        if self.original_vertexes is None:
+            return list(vertexes)
+        return self.original_vertexes[list(vertexes)].tolist()
+
+    def not_connected_pairs(self, nodelist=None):
+        """Pairs (u, v), u < v of not connected vertexes of the induced subgraph
+
+        The whole graph complement is enumerated if nodelist is None.
+        """
+        nodes_bits = (
+            self.all_vertices_bits
+            if nodelist is None
+            else vertices_to_bits(nodelist)
+        )
+        pairs = []
+        for vertex in bits_to_vertices(nodes_bits):
+            # only vertexes with bigger index to get every pair once
+            higher_bits = nodes_bits & ~((2 << vertex) - 1)
+            for other in bits_to_vertices(
+                higher_bits & ~self.adjacency[vertex],
+            ):
+                pairs.append((vertex, other))
+        return pairs
+
+    def not_connected_array(self):
+        """All pairs (u, v), u < v of not connected vertexes as np.ndarray of shape (k, 2)"""
+        row_bytes = (self.vertices_num + 7) // 8
+        pairs = []
+        for vertex, neighbors in enumerate(self.adjacency):
+            # only vertexes with bigger index to get every pair once
+            higher_bits = self.all_vertices_bits & ~((2 << vertex) - 1)
+            row = np.frombuffer(
+                (higher_bits & ~neighbors).to_bytes(row_bytes, "little"),
+                dtype=np.uint8,
+            )
+            others = np.flatnonzero(np.unpackbits(row, bitorder="little"))
+            if len(others):
+                pairs.append(
+                    np.stack([np.full_like(others, vertex), others], axis=1),
+                )
+        if not pairs:
+            return np.empty((0, 2), dtype=np.int32)
+        return np.concatenate(pairs).astype(np.int32)
+
+    @property
+    def not_connected_vertexes(self):
+        """Complement edges, generated from the adjacency at the first access"""
+        if self._not_connected_vertexes is None:
+            self._not_connected_vertexes = self.not_connected_array()
+        return self._not_connected_vertexes
+
+    @not_connected_vertexes.setter
+    def not_connected_vertexes(self, pairs):
+        self._not_connected_vertexes = pairs
+
+    def release_not_connected(self):
+        """Free complement edges (e.g. after they are moved to the model)
+
+        Next access to not_connected_vertexes generates the full (not filtered) complement again.
+        """
+        self._not_connected_vertexes = None
 
     def independent_sets_generation(
         self,
@@ -49,12 +455,18 @@ class MCPGraph:
         max_weighted: bool = False,
         solution=None,
         strategies=STRATEGIES,
+        processes: int = 1,
+        seed: int = None,
     ):
         """Independent Vertex Sets generation via graph coloring
 
             This function is also solve Max Weighted Independent Sets problem (Not a proper way of solve
                                                                                             it via coloring. I know)
 
+            Every (iteration, strategy) pair is a separate coloring job. With processes > 1 jobs are
+            spread across a process pool, with seed the random strategies get a fixed per job seed,
+            so the result does not depend on the jobs order.
+
         Returns:
         Nothing returns. Function update self.independent_vertex_sets field if max_weighted = False
                                                                             else return set of weighted ind sets
@@ -62,109 +474,379 @@ class MCPGraph:
         generated_independent_sets = (
             self.independent_vertex_sets if not max_weighted else set()
         )
-        if len(self.graph.nodes) < 500 and not max_weighted:
-            strategies.append(
-                nx.coloring.strategy_independent_set,
+        strategies = list(strategies)
+        if self.vertices_num < 500 and not max_weighted:
+            strategies.append("independent_set")
+        jobs = [
+            (
+                strategy,
+                (
+                    None
+                    if seed is None
+                    else seed + iteration * len(strategies) + strategy_idx
+                ),
             )
-        start_time = time.time()
-        for _ in range(iteration_number):
-            if time.time() - start_time >= time_limit:
-                logger.info("Reach time limit at searching ind sets")
-                break
-
-            for strategy in strategies:
-                dict_of_independet_sets = dict()
-                # get coloring with current strategy: running_coloring - dict(key=vertex, value=color)
-                running_coloring = nx.coloring.greedy_color(
-                    self.graph,
-                    strategy=strategy,
-                )
-                for vertex, color in running_coloring.items():
-                    if color not in dict_of_independet_sets.keys():
-                        dict_of_independet_sets[color] = []
-
-                    if not max_weighted:
-                        dict_of_independet_sets[color].append(vertex)
-                    else:
-                        dict_of_independet_sets[color].append(
-                            (vertex, solution[vertex]),
+            for iteration in range(iteration_number)
+            for strategy_idx, strategy in enumerate(strategies)
+        ]
+        weights = solution if max_weighted else None
+        deadline = time.time() + time_limit
+
+        def add_color_classes(classes):
+            for ind_set in map(bits_to_vertices, classes):
+                if len(ind_set) < minimum_set_size:
+                    continue
+                if max_weighted:
+                    set_weight = sum(solution[vertex] for vertex in ind_set)
+                    if set_weight > 1 + EPS:
+                        generated_independent_sets.add(
+                            tuple((tuple(ind_set), set_weight)),
                         )
+                else:
+                    generated_independent_sets.add(tuple(ind_set))
 
-                for _, ind_set in dict_of_independet_sets.items():
-                    set_weight = (
-                        sum(vertex[1] for vertex in ind_set)
-                        if max_weighted
-                        else inf
-                    )
-                    ind_set = (
-                        [vertex[0] for vertex in ind_set]
-                        if max_weighted
-                        else ind_set
-                    )
-                    if max_weighted:
-                        if (
-                            len(ind_set) >= minimum_set_size
-                            and set_weight > 1 + EPS
-                        ):
-                            generated_independent_sets.add(
-                                tuple((tuple(ind_set), set_weight)),
-                            )
-                    else:
-                        if len(ind_set) >= minimum_set_size:
-                            generated_independent_sets.add(
-                                tuple(sorted(ind_set)),
-                            )
+        if processes > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=_init_coloring_worker,
+                initargs=(self.adjacency,),
+            )
+            futures = [
+                executor.submit(
+                    _coloring_job,
+                    strategy,
+                    job_seed,
+                    weights,
+                    deadline,
+                )
+                for strategy, job_seed in jobs
+            ]
+            try:
+                for future in as_completed(
+                    futures,
+                    timeout=max(0, deadline - time.time()),
+                ):
+                    classes = future.result()
+                    if classes is not None:
+                        add_color_classes(classes)
+            except FuturesTimeoutError:
+                logger.info("Reach time limit at searching ind sets")
+                for future in futures:
+                    future.cancel()
+            # do not wait for the jobs which are still running after the time limit
+            executor.shutdown(wait=False)
+        else:
+            for strategy, job_seed in jobs:
+                if time.time() >= deadline:
+                    logger.info("Reach time limit at searching ind sets")
+                    break
+                add_color_classes(
+                    color_classes(self.adjacency, strategy, job_seed, weights),
+                )
         if max_weighted:
             return generated_independent_sets
 
-    def filter_covered_not_connected(self, filtration_limit: int = 300000):
-        filtered_not_connected = []
-        for idx, not_connected_vertexes in enumerate(
-            self.not_connected_vertexes,
-        ):
-            vertexes_are_covered_by_set = False
-            vertex_1, vertex_2 = not_connected_vertexes
-            if idx < filtration_limit:
-                for ind_set in self.independent_vertex_sets:
-                    if (vertex_1 in ind_set) and (vertex_2 in ind_set):
-                        vertexes_are_covered_by_set = True
-                        break
-            if not vertexes_are_covered_by_set:
-                filtered_not_connected.append(not_connected_vertexes)
-        self.not_connected_vertexes = filtered_not_connected
+    def content_hash(self) -> str:
+        """sha1 of the adjacency, the same for the same graph read from any file"""
+        sha1 = hashlib.sha1(str(self.vertices_num).encode())
+        row_bytes = (self.vertices_num + 7) // 8
+        for bits in self.adjacency:
+            sha1.update(bits.to_bytes(row_bytes, "little"))
+        return sha1.hexdigest()
+
+    def prepare_constraints(
+        self,
+        filter_not_connected: bool = False,
+        use_cache: bool = True,
+        minimum_set_size: int = 3,
+        iteration_number: int = 50,
+        time_limit: int = 500,
+        strategies=STRATEGIES,
+        processes: int = 1,
+        seed: int = None,
+    ):
+        """Independent sets generation (and filtration of complement edges) with the on-disk cache
+
+        The cache is content addressed: the file name is the hash of the graph adjacency
+        and of the generation parameters which change the result (processes and time_limit
+        do not, generation stopped by time_limit is not cached). Independent sets are stored
+        as CSR arrays, filtered complement edges as (u, v) pairs. Note that without seed
+        the first generated family is reused. Unreadable cache files are generated again.
+
+        Returns:
+        bool: True if the constraints are loaded from the cache
+        """
+        generation_params = dict(
+            minimum_set_size=minimum_set_size,
+            iteration_number=iteration_number,
+            strategies=list(strategies),
+            seed=seed,
+            filter_not_connected=filter_not_connected,
+        )
+        cache_dir = osp.join(CACHE_DIR, "constraints")
+        cache_key = hashlib.sha1(
+            (
+                self.content_hash()
+                + json.dumps(generation_params, sort_keys=True)
+            ).encode(),
+        ).hexdigest()
+        cache_path = osp.join(cache_dir, f"{cache_key}.npz")
+        start_time = time.time()
+        if use_cache and osp.exists(cache_path):
+            try:
+                with np.load(cache_path) as cache:
+                    independent_vertex_sets = set(
+                        csr_to_sets(cache["offsets"], cache["vertexes"]),
+                    )
+                    if filter_not_connected:
+                        not_connected_vertexes = cache["not_connected"]
+                # recently used files are evicted last
+                os.utime(cache_path)
+            except (
+                OSError,
+                EOFError,
+                ValueError,
+                KeyError,
+                zipfile.BadZipFile,
+            ) as error:
+                # e.g. a truncated file or a file evicted by a parallel run
+                logger.warning(
+                    f"Constraints cache {cache_path} is not readable ({error!r}), it is rebuilt",
+                )
+            else:
+                self.independent_vertex_sets = independent_vertex_sets
+                if filter_not_connected:
+                    self.not_connected_vertexes = not_connected_vertexes
+                self.preparation_times["constraints_cache_load"] = (
+                    time.time() - start_time
+                )
+                logger.info(
+                    f"|{self.name}| Constraints are loaded from cache {cache_path}: "
+                    f"{len(self.independent_vertex_sets)} independent sets",
+                )
+                return True
+
+        self.independent_sets_generation(
+            minimum_set_size=minimum_set_size,
+            iteration_number=iteration_number,
+            time_limit=time_limit,
+            strategies=strategies,
+            processes=processes,
+            seed=seed,
+        )
+        self.preparation_times["independent_sets_generation"] = (
+            time.time() - start_time
+        )
+        # generation stopped by the deadline depends on time_limit and on the machine
+        is_generation_complete = (
+            self.preparation_times["independent_sets_generation"] < time_limit
+        )
+        arrays = dict()
+        if filter_not_connected:
+            statistics = self.filter_covered_not_connected()
+            self.preparation_times["not_connected_filtration"] = statistics[
+                "time"
+            ]
+            arrays["not_connected"] = self.not_connected_vertexes
+        if use_cache and not is_generation_complete:
+            logger.info(
+                f"|{self.name}| Constraints are not cached: "
+                "independent sets generation reached time limit",
+            )
+        elif use_cache:
+            arrays["offsets"], arrays["vertexes"] = sets_to_csr(
+                self.independent_vertex_sets,
+            )
+            os.makedirs(cache_dir, exist_ok=True)
+            # parallel runs may write the same file, so it is replaced atomically
+            temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temporary_path, "wb") as file:
+                np.savez_compressed(file, **arrays)
+            os.replace(temporary_path, cache_path)
+            evict_cache(cache_dir)
+        return False
+
+    def filter_covered_not_connected(
+        self,
+        time_limit: float = 300,
+        chunk_memory_limit: int = 1 << 25,
+    ):
+        """Remove complement edges covered by some independent set constraint
+
+        Vertex -> set id incidence is stored as packed bits rows, so each pair (u, v)
+        is covered iff rows u and v have a common bit. Pairs are checked by chunks
+        (at most chunk_memory_limit bytes of rows per chunk) until time_limit seconds pass,
+        the remaining pairs are kept as is.
+
+        Returns:
+        dict: filtration statistics
+        """
+        start_time = time.time()
+        not_connected = self.not_connected_vertexes
+        statistics = {
+            "not_connected": len(not_connected),
+            "checked": 0,
+            "removed": 0,
+        }
+        if len(not_connected) and self.independent_vertex_sets:
+            independent_sets = list(self.independent_vertex_sets)
+            set_ids = np.repeat(
+                np.arange(len(independent_sets)),
+                [len(ind_set) for ind_set in independent_sets],
+            )
+            set_vertices = np.fromiter(
+                (vertex for ind_set in independent_sets for vertex in ind_set),
+                dtype=np.int64,
+                count=len(set_ids),
+            )
+            row_bytes = (len(independent_sets) + 7) // 8
+            incidence = np.zeros((self.vertices_num, row_bytes), np.uint8)
+            np.bitwise_or.at(
+                incidence,
+                (set_vertices, set_ids // 8),
+                (1 << (set_ids % 8)).astype(np.uint8),
+            )
+
+            is_covered = np.zeros(len(not_connected), dtype=bool)
+            chunk_size = max(1, chunk_memory_limit // (2 * row_bytes))
+            for begin in range(0, len(not_connected), chunk_size):
+                if time.time() - start_time >= time_limit:
+                    logger.info("Reach time limit at filtering not connected")
+                    break
+                chunk = not_connected[begin : begin + chunk_size]
+                is_covered[begin : begin + len(chunk)] = np.any(
+                    incidence[chunk[:, 0]] & incidence[chunk[:, 1]],
+                    axis=1,
+                )
+                statistics["checked"] += len(chunk)
+            self.not_connected_vertexes = not_connected[~is_covered]
+            statistics["removed"] = int(is_covered.sum())
+
+        statistics["kept"] = len(self.not_connected_vertexes)
+        statistics["time"] = round(time.time() - start_time, 3)
+        logger.info(f"Not connected vertexes filtration: {statistics}")
+        return statistics
 
     @staticmethod
-    def read_and_prepare_data(path: str):
-        """Read the graph data from file and convert it to adjacency matrix
+    def parse_dimacs(path: str, chunk_size: int = 1 << 22):
+        """Parse DIMACS graph file by chunks of chunk_size bytes
+
+        Returns:
+        int: vertexes number
+        np.ndarray: edges (u, v), u < v with 0-based vertexes, duplicates removed
+
+        """
+        vertices_num = 0
+        edge_chunks = []
+        with open(path, "r") as file:
+            while True:
+                # chunk of whole lines
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                chunk += file.readline()
+                if "c" in chunk or "p" in chunk:
+                    # description lines: filter edge lines one by one
+                    edge_lines = []
+                    for line in chunk.splitlines():
+                        if line.startswith("e"):
+                            edge_lines.append(line[1:])
+                        # p name num_of_vertices num_of_edges
+                        elif line.startswith("p"):
+                            _, name, vertices_num, edges_num = line.split()
+                            vertices_num = int(vertices_num)
+                            logger.info(
+                                f"Graph description: Vertexes number: {vertices_num} , Edges number: {edges_num}",
+                            )
+                    edges_text = " ".join(edge_lines)
+                else:
+                    # only "e v1 v2" lines
+                    edges_text = chunk.replace("e", " ")
+                edge_chunks.append(
+                    np.fromstring(edges_text, dtype=np.int64, sep=" "),
+                )
+        edges = np.concatenate(edge_chunks).reshape(-1, 2) - 1
+        # symmetrize: keep every edge once as (min, max) and drop loops
+        edges = np.sort(edges, axis=1)
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        edge_codes = np.sort(edges[:, 0] * vertices_num + edges[:, 1])
+        is_first = np.ones(len(edge_codes), dtype=bool)
+        is_first[1:] = edge_codes[1:] != edge_codes[:-1]
+        edges = np.stack(
+            np.divmod(edge_codes[is_first], vertices_num),
+            axis=1,
+        )
+        return vertices_num, edges.astype(np.int32)
+
+    @staticmethod
+    def read_and_prepare_data(path: str, use_cache: bool = True):
+        """Read the graph data from file (or from its binary cache)
+
+        The parsed edge list is stored in CACHE_DIR as .npz together with
+        source file mtime, size and sha1. The cache is used if mtime and size
+        are the same or if the file content hash is the same.
 
         Parameters:
         path (str): Path to the file with DIMACS graph description
+        use_cache (bool): read and update the binary cache
 
         Returns:
-        np.ndarray: adjacency matrix
+        int: vertexes number
+        np.ndarray: edges (u, v), u < v with 0-based vertexes
 
         """
-        with open(path, "r") as file:
-            for line in file:
-                # graph description
-                if line.startswith("c"):
-                    continue
-                # first line: p name num_of_vertices num_of_edges
-                elif line.startswith("p"):
-                    _, name, vertices_num, edges_num = line.split()
-                    logger.info(
-                        f"Graph description: Vertexes number: {vertices_num} , Edges number: {edges_num}",
-                    )
-                    adjacency_matrix = np.zeros(
-                        (int(vertices_num), int(vertices_num)),
-                        dtype=np.bool,
+        if not use_cache:
+            return MCPGraph.parse_dimacs(path)
+
+        path = osp.abspath(path)
+        source_stat = os.stat(path)
+        path_hash = hashlib.sha1(path.encode()).hexdigest()[:10]
+        cache_path = osp.join(
+            CACHE_DIR,
+            "graphs",
+            f"{osp.basename(path)}_{path_hash}.npz",
+        )
+        source_hash = None
+        if osp.exists(cache_path):
+            try:
+                with np.load(cache_path) as cache:
+                    is_same_file = (
+                        int(cache["mtime_ns"]) == source_stat.st_mtime_ns
+                        and int(cache["size"]) == source_stat.st_size
                     )
-                elif line.startswith("e"):
-                    _, v1, v2 = line.split()
-                    adjacency_matrix[int(v1) - 1][int(v2) - 1] = 1
-                else:
-                    continue
-        return adjacency_matrix
+                    if not is_same_file:
+                        source_hash = file_hash(path)
+                        is_same_file = str(cache["sha1"]) == source_hash
+                    if is_same_file:
+                        logger.info(f"Graph is loaded from cache {cache_path}")
+                        return int(cache["vertices_num"]), cache["edges"]
+            except (
+                OSError,
+                EOFError,
+                ValueError,
+                KeyError,
+                zipfile.BadZipFile,
+            ) as error:
+                # e.g. truncated by a killed run: parsed again and overwritten
+                logger.warning(
+                    f"Graph cache {cache_path} is not readable ({error!r}), it is rebuilt",
+                )
+
+        vertices_num, edges = MCPGraph.parse_dimacs(path)
+        os.makedirs(osp.dirname(cache_path), exist_ok=True)
+        # write to a temporary file first, so a killed run does not leave a truncated cache
+        temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            np.savez(
+                file,
+                vertices_num=vertices_num,
+                edges=edges,
+                mtime_ns=source_stat.st_mtime_ns,
+                size=source_stat.st_size,
+                sha1=source_hash or file_hash(path),
+            )
+        os.replace(temporary_path, cache_path)
+        return vertices_num, edges
 
     def __repr__(self):
         return (
@@ -1,7 +1,10 @@
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from graph import MCPGraph
-from algorithms.branch_and_bound import BNBSolver
-from algorithms.branch_and_cut import BNCSolver
+from algorithms import SOLVER_NAMES, build_solver, restore_solver
+from algorithms.decomposition import decompose
+from algorithms.heuristics import heuristic_clique
+from algorithms.search import NODE_SELECTION_STRATEGIES
 from utils import *
 from tqdm import tqdm
 import json
@@ -14,7 +17,7 @@ def parse_args():
         "-s",
         type=str,
         help="solver",
-        choices=["BnB", "BnC"],
+        choices=SOLVER_NAMES,
         default="BnB",
     )
     parser.add_argument(
@@ -31,25 +34,318 @@ def parse_args():
         help="path to output file",
         default="results.csv",
     )
+    parser.add_argument(
+        "--search",
+        type=str,
+        help="recursive depth-first search or node selection strategy of the iterative search",
+        choices=["recursive"] + NODE_SELECTION_STRATEGIES,
+        default="recursive",
+    )
+    parser.add_argument(
+        "--branching_mode",
+        type=str,
+        help="recursive search branching by x_i == value rows or by variable bounds",
+        choices=["constraint", "bound"],
+        default="constraint",
+    )
+    parser.add_argument(
+        "--heuristic_time_limit",
+        type=float,
+        help="time budget in seconds of the initial heuristic local search",
+        default=1.0,
+    )
+    parser.add_argument(
+        "--coloring_processes",
+        "-p",
+        type=int,
+        help="number of processes for independent sets generation",
+        default=1,
+    )
+    parser.add_argument(
+        "--decomposition_processes",
+        type=int,
+        help="solve degeneracy order subproblems in this number of processes (0 - one model)",
+        default=0,
+    )
+    parser.add_argument(
+        "--time_limit",
+        type=float,
+        help="time limit in seconds of one graph solve (not applied to decomposition subproblems)",
+        default=None,
+    )
+    parser.add_argument(
+        "--node_limit",
+        type=int,
+        help="search tree nodes limit of one graph solve (not applied to decomposition subproblems)",
+        default=None,
+    )
+    parser.add_argument(
+        "--checkpoint_interval",
+        type=float,
+        help="checkpoint the search of LP based solvers every this number of seconds (None - no checkpoints)",
+        default=None,
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue the search from the graph checkpoint if it exists",
+    )
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="generate independent sets without the on-disk constraints cache",
+    )
+    parser.add_argument(
+        "--stats_sample_interval",
+        type=float,
+        help="sample the incumbent and the bound every this number of seconds to the per graph JSON",
+        default=None,
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="number of graphs solved in parallel processes",
+        default=1,
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="random seed of independent sets generation",
+        default=None,
+    )
     return parser.parse_args()
 
 
 @timeit
-def benchmark(graph: namedtuple, solver_name: str):
+def benchmark(
+    graph: namedtuple,
+    solver_name: str,
+    coloring_processes: int = 1,
+    seed: int = None,
+    search_strategy: str = "recursive",
+    branching_mode: str = "constraint",
+    heuristic_time_limit: float = 1.0,
+    decomposition_processes: int = 0,
+    threads: int = 0,
+    time_limit: float = None,
+    node_limit: int = None,
+    checkpoint_interval: float = None,
+    resume: bool = False,
+    use_cache: bool = True,
+    stats_sample_interval: float = None,
+):
     graph = MCPGraph(data=graph)
-    graph.independent_sets_generation()
-    graph.filter_covered_not_connected()
-    solver = (
-        BNBSolver(graph=graph)
-        if solver_name == "BnB"
-        else BNCSolver(graph=graph)
-    )
-    solver.solve()
-    graph.maximum_clique_size_found = solver.maximum_clique_size
-    graph.is_solution_is_clique = solver.is_solution_is_clique
+    # combinatorial search has no LP model
+    solver_options = (
+        dict()
+        if solver_name == "MCS"
+        else dict(
+            search_strategy=search_strategy,
+            branching_mode=branching_mode,
+            threads=threads,
+        )
+    )
+    if decomposition_processes == 0:
+        # subproblems of the decomposition are not sampled
+        solver_options["stats_sample_interval"] = stats_sample_interval
+    # the search of one LP model can be checkpointed and resumed
+    is_checkpointed = solver_name != "MCS" and decomposition_processes == 0
+    checkpoint_path = osp.join(
+        CHECKPOINT_DIR, solver_name, f"{graph.name}.npz"
+    )
+    if resume and is_checkpointed and osp.exists(checkpoint_path):
+        # the checkpoint keeps the reduced graph, the model rows and the incumbent
+        solver = restore_solver(
+            graph,
+            solver_name,
+            checkpoint_path,
+            checkpoint_interval=(
+                checkpoint_interval
+                if checkpoint_interval is not None
+                else float("inf")
+            ),
+            **solver_options,
+        )
+    else:
+        solver = None
+        start_time = time.time()
+        # preprocessing: vertexes which can not be in a bigger clique than the heuristic one
+        initial_clique, _ = heuristic_clique(
+            graph,
+            heuristic_time_limit,
+            seed,
+        )
+        reduced_graph = graph.reduce(len(initial_clique), keep=initial_clique)
+        initial_clique = np.searchsorted(
+            reduced_graph.original_vertexes,
+            sorted(initial_clique),
+        ).tolist()
+        reduced_graph.preparation_times["preprocessing"] = (
+            time.time() - start_time
+        )
+    if solver is None and decomposition_processes > 0:
+        clique = decompose(
+            reduced_graph,
+            solver_name,
+            decomposition_processes,
+            initial_clique,
+            **solver_options,
+        )
+        # subproblems are solved without limits
+        graph.status = "optimal"
+        graph.upper_bound = len(clique)
+        graph.gap = 0.0
+        # every subproblem has its own model
+        graph.model_build_time = None
+        graph.statistics = None
+    else:
+        if solver is None:
+            if is_checkpointed and checkpoint_interval is not None:
+                solver_options.update(
+                    checkpoint_path=checkpoint_path,
+                    checkpoint_interval=checkpoint_interval,
+                )
+            solver = build_solver(
+                reduced_graph,
+                solver_name,
+                coloring_processes,
+                seed,
+                use_cache,
+                initial_clique=initial_clique,
+                **solver_options,
+            )
+        solver.solve(time_limit, node_limit)
+        clique = solver.graph.to_original(
+            np.flatnonzero(np.isclose(solver.best_solution, 1.0, atol=1e-5)),
+        )
+        graph.status = solver.status
+        graph.upper_bound = solver.upper_bound
+        graph.gap = solver.gap
+        graph.model_build_time = solver.model_build_time
+        graph.statistics = solver.statistics()
+    graph.maximum_clique_size_found = len(clique)
+    graph.is_solution_is_clique = graph.is_clique(clique)
     return graph
 
 
+# benchmark graphs of the parallel benchmark process pool worker
+_worker_benchmark_graphs = None
+
+
+def _init_benchmark_worker(input_data_file):
+    global _worker_benchmark_graphs
+    # benchmark namedtuple class is created on reading, so graphs are read by the worker
+    _worker_benchmark_graphs = read_benchmarks(input_data_file)
+    # every graph of the worker is logged to its own file instead of the main process sinks
+    logger.remove()
+
+
+def _benchmark_job(graph_idx, args, threads, log_dir):
+    # solver errors (e.g. CPLEX ones) are not always picklable, so only their text is returned
+    graph = _worker_benchmark_graphs[graph_idx]
+    try:
+        return run_benchmark(graph, args, threads, log_dir)
+    except Exception as error:
+        logger.exception(f"{args.solver} failed for {graph.GraphName[:-4]} !")
+        # the graph log sink is left by the failed benchmark, workers have no other sinks
+        logger.remove()
+        return error_row(graph, error)
+
+
+def error_row(graph: namedtuple, error: BaseException):
+    """CSV report row of the graph which benchmark failed with error"""
+    logger.error(f"{graph.GraphName[:-4]} benchmark failed: {error!r}")
+    return [
+        graph.GraphName[:-4],
+        str(graph.CorrectMaxClique),
+        str(graph.Level),
+        "None",
+        "None",
+        "None",
+        f"error: {error}",
+        "None",
+        "None",
+        "None",
+    ]
+
+
+def run_benchmark(
+    graph: namedtuple,
+    args: argparse.Namespace,
+    threads: int = 0,
+    log_dir: str = None,
+):
+    """Benchmark of one graph, its result is dumped to per graph JSON
+
+    Returns:
+    list: CSV report row
+
+    """
+    graph_name = graph.GraphName[:-4]
+    if log_dir is not None:
+        log_sink = logger.add(osp.join(log_dir, f"{graph_name}.log"), mode="w")
+    logger.info(f"{args.solver} started for {graph_name} !")
+    graph, work_time = benchmark(
+        graph,
+        args.solver,
+        args.coloring_processes,
+        args.seed,
+        args.search,
+        args.branching_mode,
+        args.heuristic_time_limit,
+        args.decomposition_processes,
+        threads,
+        args.time_limit,
+        args.node_limit,
+        args.checkpoint_interval,
+        args.resume,
+        not args.no_cache,
+        args.stats_sample_interval,
+    )
+    curr_result = {
+        "Right Maximum Clique Size": str(graph.maximum_clique_size_gt),
+        "Found Maximum Clique Size": str(graph.maximum_clique_size_found),
+        "Consumed Time": str(work_time),
+        "Is Clique": str(graph.is_solution_is_clique),
+        "Graph Complexity": str(graph.complexity_type),
+        "Status": str(graph.status),
+        "Upper Bound": str(graph.upper_bound),
+        "Gap": str(graph.gap),
+        "Model Build Time": str(graph.model_build_time),
+        # phase times, counters and (seconds, nodes, incumbent, bound) samples of the solver
+        "Statistics": graph.statistics,
+    }
+    per_graph_result_dir = osp.join(
+        RESULTS_DIR,
+        "per_graph_results",
+        f"{args.solver}",
+    )
+    os.makedirs(per_graph_result_dir, exist_ok=True)
+
+    with open(
+        osp.join(per_graph_result_dir, f"{graph_name}.json"),
+        "w",
+    ) as file:
+        json.dump(curr_result, file, indent=4)
+
+    logger.info(f"{args.solver} finished for {graph_name} !")
+    if log_dir is not None:
+        logger.remove(log_sink)
+    return [
+        str(graph.name),
+        str(graph.maximum_clique_size_gt),
+        str(graph.complexity_type),
+        str(graph.maximum_clique_size_found),
+        str(graph.is_solution_is_clique),
+        str(work_time),
+        str(graph.status),
+        str(graph.upper_bound),
+        str(graph.gap),
+        str(graph.model_build_time),
+    ]
+
+
 def main():
     args = parse_args()
     benchmark_graphs = read_benchmarks(args.input_data_file)
@@ -60,11 +356,14 @@ def main():
         "Found Max Clique",
         "Is Clique",
         "Consumed Time",
+        "Status",
+        "Upper Bound",
+        "Gap",
+        "Model Build Time",
     ]
     results = [column_names]
     logger_output_path = osp.join(
-        osp.dirname(__file__),
-        "becnhmark_logs",
+        LOG_DIR,
         f"{args.input_data_file[:-4]}.log",
     )
 
@@ -73,43 +372,39 @@ def main():
 
     logger.add(logger_output_path)
 
-    for idx, graph in enumerate(tqdm(benchmark_graphs)):
-        graph_name = graph.GraphName[:-4]
-        logger.info(f"{args.solver} started for {graph_name} !")
-        # try:
-        graph, work_time = benchmark(graph, args.solver)
-        results.append(
-            [
-                str(graph.name),
-                str(graph.maximum_clique_size_gt),
-                str(graph.complexity_type),
-                str(graph.maximum_clique_size_found),
-                str(graph.is_solution_is_clique),
-                str(work_time),
-            ],
-        )
-        curr_result = {
-            "Right Maximum Clique Size": str(graph.maximum_clique_size_gt),
-            "Found Maximum Clique Size": str(graph.maximum_clique_size_found),
-            "Consumed Time": str(work_time),
-            "Is Clique": str(graph.is_solution_is_clique),
-            "Graph Complexity": str(graph.complexity_type),
-        }
-        per_graph_result_dir = osp.join(
-            RESULTS_DIR,
-            "per_graph_results",
-            f"{args.solver}",
-        )
-        if not osp.exists(per_graph_result_dir):
-            os.makedirs(per_graph_result_dir)
-
-        with open(
-            osp.join(per_graph_result_dir, f"{graph_name}.json"),
-            "w",
-        ) as file:
-            json.dump(curr_result, file, indent=4)
-
-        logger.info(f"{args.solver} finished for {graph_name} !")
+    if args.jobs > 1:
+        graph_log_dir = osp.join(LOG_DIR, args.input_data_file[:-4])
+        os.makedirs(graph_log_dir, exist_ok=True)
+        # CPLEX threads are shared between the workers
+        threads = max(1, (os.cpu_count() or 1) // args.jobs)
+        with ProcessPoolExecutor(
+            max_workers=args.jobs,
+            initializer=_init_benchmark_worker,
+            initargs=(args.input_data_file,),
+        ) as executor:
+            # future -> index of its graph
+            futures = {
+                executor.submit(
+                    _benchmark_job,
+                    graph_idx,
+                    args,
+                    threads,
+                    graph_log_dir,
+                ): graph_idx
+                for graph_idx in range(len(benchmark_graphs))
+            }
+            for future in tqdm(as_completed(futures), total=len(futures)):
+                try:
+                    results.append(future.result())
+                except Exception as error:
+                    # e.g. the worker process died
+                    results.append(
+                        error_row(benchmark_graphs[futures[future]], error),
+                    )
+                logger.info(f"{args.solver} finished for {results[-1][0]} !")
+    else:
+        for graph in tqdm(benchmark_graphs):
+            results.append(run_benchmark(graph, args))
 
     dump_results_to_csv("report", results)
 
@@ -0,0 +1,359 @@
+import argparse
+import platform
+import random
+import statistics
+import subprocess
+import sys
+from graph import MCPGraph
+from algorithms import SOLVER_NAMES, build_solver, get_solver_class
+from algorithms.heuristics import heuristic_clique
+from algorithms.separation import separate_clique_inequalities
+from utils import *
+import json
+
+PERFORMANCE_RESULTS_DIR = osp.join(RESULTS_DIR, "performance")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Micro (pipeline stages) and macro (full solves) benchmarks with baseline comparison",
+    )
+    parser.add_argument(
+        "--input_data_file",
+        "-i",
+        type=str,
+        help="path to file with input benchmarks data",
+        default="easy.txt",
+    )
+    parser.add_argument(
+        "--suite",
+        type=str,
+        help="benchmarks to run",
+        choices=["micro", "macro", "all"],
+        default="all",
+    )
+    parser.add_argument(
+        "--solvers",
+        type=str,
+        nargs="+",
+        help="solvers of the macro benchmarks",
+        choices=SOLVER_NAMES,
+        default=SOLVER_NAMES,
+    )
+    parser.add_argument(
+        "--repetitions",
+        "-r",
+        type=int,
+        help="number of measurements of every benchmark",
+        default=5,
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="random seed of independent sets generation, heuristics and random LP solutions",
+        default=0,
+    )
+    parser.add_argument(
+        "--time_limit",
+        type=float,
+        help="time limit in seconds of one macro benchmark solve",
+        default=60,
+    )
+    parser.add_argument(
+        "--heuristic_time_limit",
+        type=float,
+        help="time budget in seconds of the initial heuristic local search of macro benchmarks",
+        default=0.0,
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        help="results JSON to compare with",
+        default=None,
+    )
+    parser.add_argument(
+        "--update_baseline",
+        action="store_true",
+        help="write the results to the --baseline path",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        help="relative slowdown of the median which is reported as a regression",
+        default=0.2,
+    )
+    parser.add_argument(
+        "--min_time",
+        type=float,
+        help="medians of both runs below this number of seconds are not compared (timer noise)",
+        default=1e-3,
+    )
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="store_true",
+        help="log the solvers too (logging is a part of the measured time)",
+    )
+    return parser.parse_args()
+
+
+def machine_info():
+    """Machine, interpreter and code version of the measurements"""
+    info = {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "timestamp": timestamp,
+    }
+    try:
+        import cplex
+
+        info["cplex"] = cplex.__version__
+    except ImportError:
+        info["cplex"] = None
+    try:
+        info["commit"] = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=osp.dirname(osp.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        info["commit"] = None
+    return info
+
+
+def measure(run, repetitions: int, setup=None, number: int = 1):
+    """Median, mean and standard deviation of run() time over repetitions
+
+    Parameters:
+    run (callable): measured function, it gets the setup() result if setup is given
+    repetitions (int): number of measurements
+    setup (callable): not measured preparation before every measurement
+    number (int): run calls per measurement (for functions faster than the timer resolution)
+
+    Returns:
+    dict: times (seconds per call) statistics and the last run() result
+
+    """
+    times, result = [], None
+    for _ in range(repetitions):
+        argument = setup() if setup is not None else None
+        start_time = time.perf_counter()
+        for _ in range(number):
+            result = run(argument) if setup is not None else run()
+        times.append((time.perf_counter() - start_time) / number)
+    return {
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "times": times,
+        "result": result,
+    }
+
+
+def micro_benchmarks(graph_data, repetitions: int, seed: int):
+    """Pipeline stages of one graph: parse, constraints generation, model build, separation, clique check"""
+    path = osp.join(SOURCE_GRAPH_DIR, graph_data.GraphName)
+    results = dict()
+    results["dimacs_parse"] = measure(
+        lambda: MCPGraph.parse_dimacs(path),
+        repetitions,
+    )
+    graph = MCPGraph(data=graph_data)
+
+    def generation_setup():
+        graph.independent_vertex_sets = set()
+
+    results["independent_sets_generation"] = measure(
+        lambda _: graph.independent_sets_generation(seed=seed),
+        repetitions,
+        setup=generation_setup,
+    )
+
+    def filtration_setup():
+        # the full complement is generated before the measurement
+        graph.release_not_connected()
+        len(graph.not_connected_vertexes)
+
+    results["not_connected_filtration"] = measure(
+        lambda _: graph.filter_covered_not_connected(),
+        repetitions,
+        setup=filtration_setup,
+    )
+    filtered_not_connected = graph.not_connected_vertexes
+
+    def model_setup():
+        graph.not_connected_vertexes = filtered_not_connected
+        # the model is built by the solver constructor
+        return get_solver_class("BnB")
+
+    try:
+        results["model_build"] = measure(
+            lambda solver_class: solver_class(graph=graph, initial_clique=[]),
+            repetitions,
+            setup=model_setup,
+        )
+    except ImportError:
+        logger.info("Model build benchmark is skipped: cplex is not installed")
+
+    rng = np.random.default_rng(seed)
+    solution = rng.random(graph.vertices_num).tolist()
+    results["separation"] = measure(
+        lambda: separate_clique_inequalities(graph.adjacency, solution),
+        repetitions,
+    )
+    clique, _ = heuristic_clique(graph, time_limit=0, seed=seed)
+    clique = sorted(clique)
+    results["clique_check"] = measure(
+        lambda: graph.is_clique(clique),
+        repetitions,
+        number=100,
+    )
+    for name, result in results.items():
+        result.pop("result")
+    return results
+
+
+def macro_benchmark(
+    graph_data,
+    solver_name: str,
+    repetitions: int,
+    seed: int,
+    time_limit: float,
+    heuristic_time_limit: float,
+):
+    """Full solves of one graph (constraints generation is not cached) capped by time_limit"""
+
+    def setup():
+        random.seed(seed)
+        graph = MCPGraph(data=graph_data)
+        initial_clique, _ = heuristic_clique(graph, heuristic_time_limit, seed)
+        return graph, sorted(initial_clique)
+
+    def run(argument):
+        graph, initial_clique = argument
+        solver = build_solver(
+            graph,
+            solver_name,
+            seed=seed,
+            use_cache=False,
+            initial_clique=initial_clique,
+        )
+        solver.solve(time_limit, None)
+        return solver
+
+    result = measure(run, repetitions, setup=setup)
+    solver = result.pop("result")
+    result.update(
+        status=solver.status,
+        clique_size=solver.maximum_clique_size,
+        upper_bound=solver.upper_bound,
+        nodes=solver.nodes_num,
+    )
+    return result
+
+
+def compare_with_baseline(
+    results, baseline, tolerance: float, min_time: float
+):
+    """Benchmarks whose median is slower than the baseline one by more than tolerance
+
+    Returns:
+    list: (benchmark name, baseline median, median, ratio) of regressions
+
+    """
+    regressions = []
+    for name, result in results["benchmarks"].items():
+        baseline_result = baseline["benchmarks"].get(name)
+        if baseline_result is None:
+            continue
+        baseline_median, median = baseline_result["median"], result["median"]
+        if max(baseline_median, median) < min_time:
+            continue
+        ratio = median / max(baseline_median, 1e-12)
+        logger.info(
+            f"{name}: {baseline_median:.6f} -> {median:.6f} seconds ({ratio:.2f}x)",
+        )
+        if ratio > 1 + tolerance:
+            regressions.append((name, baseline_median, median, ratio))
+    return regressions
+
+
+def main():
+    args = parse_args()
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, filter=__name__)
+    benchmark_graphs = read_benchmarks(args.input_data_file)
+    results = {
+        "machine": machine_info(),
+        "parameters": vars(args),
+        "benchmarks": dict(),
+    }
+    for graph_data in benchmark_graphs:
+        graph_name = graph_data.GraphName[:-4]
+        if args.suite in ("micro", "all"):
+            logger.info(f"Micro benchmarks of {graph_name}")
+            for name, result in micro_benchmarks(
+                graph_data,
+                args.repetitions,
+                args.seed,
+            ).items():
+                results["benchmarks"][f"micro/{name}/{graph_name}"] = result
+        if args.suite in ("macro", "all"):
+            for solver_name in args.solvers:
+                logger.info(
+                    f"Macro benchmark of {solver_name} on {graph_name}"
+                )
+                results["benchmarks"][f"macro/{solver_name}/{graph_name}"] = (
+                    macro_benchmark(
+                        graph_data,
+                        solver_name,
+                        args.repetitions,
+                        args.seed,
+                        args.time_limit,
+                        args.heuristic_time_limit,
+                    )
+                )
+
+    os.makedirs(PERFORMANCE_RESULTS_DIR, exist_ok=True)
+    path = osp.join(
+        PERFORMANCE_RESULTS_DIR,
+        f"{args.input_data_file[:-4]}_{timestamp}.json",
+    )
+    with open(path, "w") as file:
+        json.dump(results, file, indent=4)
+    logger.info(f"Results are saved to {path}")
+
+    regressions = []
+    if args.baseline is not None and args.update_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=4)
+        logger.info(f"Baseline {args.baseline} is updated")
+    elif args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline["machine"]["platform"] != results["machine"]["platform"]:
+            logger.warning(
+                f"Baseline was measured on another machine: {baseline['machine']['platform']}",
+            )
+        regressions = compare_with_baseline(
+            results,
+            baseline,
+            args.tolerance,
+            args.min_time,
+        )
+        for name, baseline_median, median, ratio in regressions:
+            logger.warning(
+                f"Regression {name}: {baseline_median:.6f} -> {median:.6f} seconds ({ratio:.2f}x)",
+            )
+    # non zero exit code marks regressions, e.g. for CI
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,33 @@
 import csv
 import datetime
+import hashlib
+import itertools
 import os
 import os.path as osp
 import time
 from collections import namedtuple
 import networkx as nx
+import numpy as np
 from loguru import logger
 
 DATA_DIR = osp.join(osp.dirname(__file__), "benchmarks")
 SOURCE_GRAPH_DIR = osp.join(osp.dirname(__file__), "data")
 RESULTS_DIR = osp.join(osp.dirname(__file__), "results")
+CACHE_DIR = osp.join(osp.dirname(__file__), "cache")
+CHECKPOINT_DIR = osp.join(osp.dirname(__file__), "checkpoints")
 LOG_DIR = osp.join(osp.dirname(__file__), "becnhmark_logs")
+# the least recently used files are evicted when a cache directory is bigger
+CACHE_SIZE_LIMIT = 1 << 30
 
 EPS = 1e-5
+# coloring strategies names (see coloring.color_classes)
 STRATEGIES = [
-    nx.coloring.strategy_largest_first,
-    nx.coloring.strategy_random_sequential,
-    nx.coloring.strategy_connected_sequential_bfs,
-    nx.coloring.strategy_connected_sequential_dfs,
-    nx.coloring.strategy_saturation_largest_first,
-    nx.coloring.strategy_smallest_last,
+    "largest_first",
+    "random_sequential",
+    "connected_sequential_bfs",
+    "connected_sequential_dfs",
+    "saturation_largest_first",
+    "smallest_last",
 ]
 
 timestamp = datetime.datetime.now().strftime("%Y_%m_%d_%H:%M")
@@ -37,9 +45,9 @@ def dump_results_to_csv(output_name, results):
 def timeit(f):
     """Measures time of function execution"""
 
-    def wrap(*args):
+    def wrap(*args, **kwargs):
         time1 = time.time()
-        result = f(*args)
+        result = f(*args, **kwargs)
         time2 = time.time()
         work_time = round(time2 - time1, 3)
         logger.info(f"Function: <{f.__name__}> worked {work_time} seconds")
@@ -48,6 +56,105 @@ def timeit(f):
     return wrap
 
 
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def evict_cache(directory: str, size_limit: int = CACHE_SIZE_LIMIT):
+    """Remove the least recently used (by mtime) files until the directory size fits size_limit
+
+    Returns:
+    int: number of removed files
+
+    """
+    if not osp.isdir(directory):
+        return 0
+    # temporary files of unfinished writes are skipped
+    files = [
+        entry
+        for entry in os.scandir(directory)
+        if entry.is_file() and not entry.name.endswith(".tmp")
+    ]
+    files.sort(key=lambda entry: entry.stat().st_mtime_ns)
+    total_size = sum(entry.stat().st_size for entry in files)
+    removed_num = 0
+    for entry in files:
+        if total_size <= size_limit:
+            break
+        total_size -= entry.stat().st_size
+        os.remove(entry.path)
+        removed_num += 1
+    if removed_num:
+        logger.info(f"Cache {directory}: {removed_num} files evicted")
+    return removed_num
+
+
+def popcount(bits: int) -> int:
+    """Number of vertices in the bitset"""
+    return bin(bits).count("1")
+
+
+def vertices_to_bits(vertices) -> int:
+    bits = 0
+    for vertex in vertices:
+        bits |= 1 << vertex
+    return bits
+
+
+def bits_to_vertices(bits: int) -> list:
+    vertices = []
+    while bits:
+        lowest_bit = bits & -bits
+        vertices.append(lowest_bit.bit_length() - 1)
+        bits ^= lowest_bit
+    return vertices
+
+
+def bits_to_array(bits: int) -> np.ndarray:
+    """Vertexes of the bitset as np.ndarray (faster than bits_to_vertices for big sets)"""
+    packed = np.frombuffer(
+        bits.to_bytes((bits.bit_length() + 7) // 8, "little"),
+        dtype=np.uint8,
+    )
+    return np.flatnonzero(np.unpackbits(packed, bitorder="little"))
+
+
+def array_to_bits(vertices: np.ndarray, size: int) -> int:
+    """Bitset of vertexes given as np.ndarray (faster than vertices_to_bits for big sets)"""
+    row = np.zeros(size, dtype=bool)
+    row[vertices] = True
+    return int.from_bytes(
+        np.packbits(row, bitorder="little").tobytes(),
+        "little",
+    )
+
+
+def sets_to_csr(vertex_sets):
+    """Vertexes sets as CSR arrays: offsets (number of sets + 1) and concatenated vertexes"""
+    vertex_sets = list(vertex_sets)
+    offsets = np.zeros(len(vertex_sets) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(vertex_set) for vertex_set in vertex_sets])
+    vertexes = np.fromiter(
+        itertools.chain.from_iterable(vertex_sets),
+        dtype=np.int32,
+        count=offsets[-1],
+    )
+    return offsets, vertexes
+
+
+def csr_to_sets(offsets: np.ndarray, vertexes: np.ndarray):
+    """Vertexes sets (tuples) from CSR arrays"""
+    vertexes = vertexes.tolist()
+    return [
+        tuple(vertexes[start:end])
+        for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())
+    ]
+
+
 def read_benchmarks(data_file: str = "benchmarks.txt"):
     with open(osp.join(DATA_DIR, data_file)) as test_data:
         column_names = test_data.readline().strip().split(",")